@@ -144,10 +144,10 @@ class CheckHandler:
             wallet_data = {}
             for company_name, company_wallets in wallet_list_data['companies'].items():
                 for wallet in company_wallets:
-                    wallet_key = f"{wallet['name']}"
+                    wallet_key = f"{wallet.name}"
                     wallet_data[wallet_key] = {
-                        'wallet': wallet['name'],  # FIXED: Use 'wallet' key instead of 'name'
-                        'address': wallet['address'],
+                        'wallet': wallet.name,  # FIXED: Use 'wallet' key instead of 'name'
+                        'address': wallet.address,
                         'company': company_name  # Use the actual company name from the data structure
                     }
 
@@ -169,9 +169,11 @@ class CheckHandler:
                     await context.topic_manager.send_command_response(error_card, msg_type="interactive")
                     return False
 
-            # Show "checking..." message
+            # Show "checking..." message, sent while the balances are being fetched
             checking_card = self._create_checking_card(len(wallets_to_check))
-            await context.topic_manager.send_command_response(checking_card, msg_type="interactive")
+            checking_sent = asyncio.ensure_future(
+                context.topic_manager.send_command_response(checking_card, msg_type="interactive")
+            )
 
             # Create address mapping for balance service
             address_mapping = {name: info['address'] for name, info in wallets_to_check.items()}
@@ -186,6 +188,12 @@ class CheckHandler:
                     timeout=30.0  # 30 second timeout
                 )
             except asyncio.TimeoutError:
+                balances = None
+            finally:
+                # Keep reply order: the checking card goes out before any result card
+                await checking_sent
+            
+            if balances is None:
                 logger.error("⏰ Balance fetch timed out after 30 seconds")
                 timeout_card = self._create_timeout_error_card()
                 await context.topic_manager.send_command_response(timeout_card, msg_type="interactive")
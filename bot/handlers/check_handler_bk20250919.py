@@ -142,10 +142,10 @@ class CheckHandler:
             wallet_data = {}
             for company_name, company_wallets in wallet_list_data['companies'].items():
                 for wallet in company_wallets:
-                    wallet_key = f"{wallet['name']}"
+                    wallet_key = f"{wallet.name}"
                     wallet_data[wallet_key] = {
-                        'wallet': wallet['name'],  # FIXED: Use 'wallet' key instead of 'name'
-                        'address': wallet['address'],
+                        'wallet': wallet.name,  # FIXED: Use 'wallet' key instead of 'name'
+                        'address': wallet.address,
                         'company': company_name  # Use the actual company name from the data structure
                     }
 
@@ -87,8 +87,8 @@ class ListHandler:
             # Wallet list for this company
             wallet_list = []
             for wallet in wallets:
-                wallet_name = wallet.get('name', 'Unknown')
-                wallet_address = wallet.get('address', 'Unknown')
+                wallet_name = wallet.name
+                wallet_address = wallet.address
                 wallet_list.append(f"• **{wallet_name}**: {wallet_address}")
             
             elements.append({
@@ -175,8 +175,8 @@ class ListHandler:
                 for company_name, wallets in companies.items():
                     text_lines.append(f"🏢 **{company_name}**")
                     for wallet in wallets:
-                        wallet_name = wallet.get('name', 'Unknown')
-                        wallet_address = wallet.get('address', 'Unknown')
+                        wallet_name = wallet.name
+                        wallet_address = wallet.address
                         text_lines.append(f"• **{wallet_name}**: {wallet_address}")
                     text_lines.append("")  # Empty line between companies
                 
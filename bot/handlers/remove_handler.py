@@ -83,13 +83,13 @@ class RemoveHandler:
                 if success and 'companies' in wallet_data:
                     for company_name, company_wallets in wallet_data['companies'].items():
                         for wallet in company_wallets:
-                            if wallet['address'].lower() == identifier.lower():
+                            if wallet.address.lower() == identifier.lower():
                                 # Found wallet with matching address
                                 # FIXED: Use 'wallet' key instead of 'name' to match JSON structure
                                 wallet_info = {
-                                    'name': wallet['name'],  # This comes from list_wallets which uses 'name' in output
-                                    'wallet': wallet['name'],  # Add wallet key for consistency
-                                    'address': wallet['address'],
+                                    'name': wallet.name,  # This comes from list_wallets which uses 'name' in output
+                                    'wallet': wallet.name,  # Add wallet key for consistency
+                                    'address': wallet.address,
                                     'company': company_name
                                 }
                                 return True, wallet_info
@@ -251,7 +251,7 @@ class RemoveHandler:
                 all_wallet_names = []
                 for company_wallets in wallet_data['companies'].values():
                     for wallet in company_wallets:
-                        all_wallet_names.append(wallet['name'])
+                        all_wallet_names.append(wallet.name)
                 
                 # Find similar names (only for name searches, not addresses)
                 if not self.balance_service.validate_trc20_address(identifier):
@@ -1,42 +1,56 @@
 #!/usr/bin/env python3
 """
 Lark API Client Module
-Handles all Lark API interactions: authentication, messaging, polling
+Handles all Lark API interactions: authentication, messaging
 """
 
 import asyncio
 import aiohttp
 import json
 import logging
+import time
 from typing import Dict, List, Optional, Any
-from datetime import datetime, timedelta
 
 logger = logging.getLogger(__name__)
 
 class LarkAPIClient:
     """
     Lark API client for bot operations.
-    Handles authentication, messaging, and polling.
+    Handles authentication and messaging.
     """
     
     def __init__(self, app_id: str, app_secret: str):
         self.app_id = app_id
         self.app_secret = app_secret
         self.access_token = None
-        self.token_expires_at = None
+        self.token_expires_at = None  # time.monotonic() deadline
         self.base_url = "https://open.larksuite.com/open-apis"
         self.session = None
         
     async def __aenter__(self):
         """Async context manager entry."""
-        self.session = aiohttp.ClientSession()
+        await self.start()
         await self.get_access_token()
         return self
         
     async def __aexit__(self, exc_type, exc_val, exc_tb):
         """Async context manager exit."""
+        await self.close()
+    
+    async def start(self):
+        """
+        Open the pooled HTTP session if it is not already open.
+        Long-running servers call this once so every request reuses keep-alive connections.
+        """
+        if self.session is None or self.session.closed:
+            connector = aiohttp.TCPConnector(limit=100, keepalive_timeout=75, ttl_dns_cache=300)
+            self.session = aiohttp.ClientSession(connector=connector)
+    
+    async def close(self):
+        """Close the pooled HTTP session."""
         if self.session:
             await self.session.close()
+            self.session = None
     
     async def get_access_token(self) -> str:
         """
@@ -45,7 +59,7 @@ class LarkAPIClient:
         """
         # Check if current token is still valid
         if self.access_token and self.token_expires_at:
-            if datetime.now() < self.token_expires_at - timedelta(minutes=5):
+            if time.monotonic() < self.token_expires_at - 5 * 60:
                 return self.access_token
         
         # Get new token
@@ -62,7 +76,7 @@ class LarkAPIClient:
                     if data.get("code") == 0:
                         self.access_token = data["tenant_access_token"]
                         # Token expires in 2 hours, store expiry time
-                        self.token_expires_at = datetime.now() + timedelta(seconds=data["expire"])
+                        self.token_expires_at = time.monotonic() + data["expire"]
                         logger.info("✅ Lark access token obtained successfully")
                         return self.access_token
                     else:
@@ -246,81 +260,6 @@ class LarkAPIClient:
             logger.error(f"❌ Lark API connection test failed: {e}")
             return False
 
-class LarkMessagePoller:
-    """
-    Polls Lark for new messages in specific chats/topics.
-    Alternative to webhook-based approach.
-    """
-    
-    def __init__(self, api_client: LarkAPIClient, chat_id: str, poll_interval: int = 30):
-        self.api_client = api_client
-        self.chat_id = chat_id
-        self.poll_interval = poll_interval
-        self.last_message_time = None
-        self.is_running = False
-        
-    async def start_polling(self, message_handler=None, topic_filter: str = None):
-        """
-        Start polling for new messages.
-        
-        Args:
-            message_handler: Async function to handle new messages
-            topic_filter: Only process messages from this topic thread_id
-        """
-        self.is_running = True
-        logger.info(f"🔄 Starting message polling for chat {self.chat_id}")
-        
-        if topic_filter:
-            logger.info(f"🎯 Filtering for topic: {topic_filter}")
-        
-        while self.is_running:
-            try:
-                # Get recent messages
-                messages = await self.api_client.get_chat_messages(self.chat_id, limit=10)
-                
-                # Filter new messages
-                new_messages = []
-                for msg in messages:
-                    msg_time = datetime.fromtimestamp(int(msg.get("create_time", 0)) / 1000)
-                    
-                    # Skip if we've seen this message before
-                    if self.last_message_time and msg_time <= self.last_message_time:
-                        continue
-                    
-                    # Filter by topic if specified
-                    if topic_filter and msg.get("thread_id") != topic_filter:
-                        continue
-                    
-                    new_messages.append(msg)
-                
-                # Update last seen time
-                if messages:
-                    latest_time = max(
-                        datetime.fromtimestamp(int(msg.get("create_time", 0)) / 1000)
-                        for msg in messages
-                    )
-                    self.last_message_time = latest_time
-                
-                # Process new messages
-                if new_messages and message_handler:
-                    for msg in reversed(new_messages):  # Process oldest first
-                        try:
-                            await message_handler(msg)
-                        except Exception as e:
-                            logger.error(f"❌ Error handling message: {e}")
-                
-                # Wait before next poll
-                await asyncio.sleep(self.poll_interval)
-                
-            except Exception as e:
-                logger.error(f"❌ Polling error: {e}")
-                await asyncio.sleep(self.poll_interval)
-    
-    def stop_polling(self):
-        """Stop the polling loop."""
-        self.is_running = False
-        logger.info("⏹️ Stopping message polling")
-
 # Example usage and testing
 async def test_lark_client():
     """Test function for the Lark API client."""
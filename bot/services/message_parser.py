@@ -4,9 +4,11 @@ Lark Message Parser Module
 Handles parsing and validation of incoming Lark messages
 """
 
+import functools
 import json
 import logging
 import re
+import sys
 from typing import Dict, Any, Optional, List, Tuple
 from datetime import datetime
 
@@ -32,8 +34,9 @@ class LarkMessage:
             logger.warning(f"⚠️ Failed to extract sender_id: {e}")
             return ""
 
-    @property
+    @functools.cached_property
     def content(self) -> str:
+        # Decoded once: is_command and parse_command both read it
         try:
             raw = self.message.get("content", "")
             if isinstance(raw, str):
@@ -113,7 +116,8 @@ class LarkMessageParser:
         if not parts:
             return "", []
         
-        command = parts[0].lower()
+        # Casefolded and interned: registry lookups then hit the str identity fast path
+        command = sys.intern(parts[0].casefold())
         args = parts[1:] if len(parts) > 1 else []
         
         return command, args
@@ -9,13 +9,17 @@ import json
 import logging
 import os
 from typing import Dict, List, Tuple, Any
-from collections import defaultdict
+from collections import defaultdict, namedtuple
 
 # Import the Tron validator
 from bot.services.tron_validator import TronAddressValidator
+from bot.utils.config import Config
 
 logger = logging.getLogger(__name__)
 
+# Lightweight per-wallet record returned by list_wallets (display name, address, JSON key)
+WalletRec = namedtuple('WalletRec', ['name', 'address', 'key'])
+
 class WalletService:
     """Service for managing wallet data from JSON file."""
     
@@ -24,6 +28,24 @@ class WalletService:
         self.logger = logger
         self.tron_validator = TronAddressValidator()
 
+    @staticmethod
+    def _index_wallets(wallets: Dict) -> Tuple[Dict[str, str], Dict[str, str]]:
+        """Build lowercased name -> key and address -> key indexes in a single pass."""
+        by_name_lower: Dict[str, str] = {}
+        by_address: Dict[str, str] = {}
+        for wallet_key, wallet_data in wallets.items():
+            # Malformed entries are left out of the indexes but stay in the file
+            if not isinstance(wallet_data, dict):
+                continue
+            # Handle both old format ('name') and new format ('wallet')
+            name = wallet_data.get('wallet', wallet_data.get('name', wallet_key))
+            if isinstance(name, str):
+                by_name_lower.setdefault(name.lower(), wallet_key)
+            address = wallet_data.get('address')
+            if address:
+                by_address.setdefault(address, wallet_key)
+        return by_name_lower, by_address
+
     def _load_wallets(self) -> Dict:
         """Load wallets from JSON file."""
         try:
@@ -34,22 +56,15 @@ class WalletService:
             
             with open(self.wallet_file, 'r', encoding='utf-8') as f:
                 data = json.load(f)
-                self.logger.info(f"Loaded {len(data)} wallets from {self.wallet_file}")
+                self.logger.info("Loaded %d wallets from %s", len(data), self.wallet_file)
                 return data
         except Exception as e:
-            self.logger.error(f"Error loading wallets: {e}")
+            self.logger.error("Error loading wallets: %s", e)
             return {}
 
     def _save_wallets(self, wallets: Dict) -> bool:
-        """Save wallets to JSON file."""
-        try:
-            with open(self.wallet_file, 'w', encoding='utf-8') as f:
-                json.dump(wallets, f, indent=2, ensure_ascii=False)
-            self.logger.info(f"Saved {len(wallets)} wallets to {self.wallet_file}")
-            return True
-        except Exception as e:
-            self.logger.error(f"Error saving wallets: {e}")
-            return False
+        """Save wallets to JSON file (same format, atomic write and backups as Config)."""
+        return Config.save_wallets(wallets, self.wallet_file)
 
     def list_wallets(self) -> Tuple[bool, Dict]:
         """
@@ -59,7 +74,7 @@ class WalletService:
             'total_count': int,
             'companies': {
                 'company_name': [
-                    {'name': 'wallet_name', 'address': 'wallet_address'}, 
+                    WalletRec(name='wallet_name', address='wallet_address', key='wallet_key'),
                     ...
                 ]
             }
@@ -86,17 +101,13 @@ class WalletService:
                 name = wallet_data.get('wallet', wallet_data.get('name', wallet_key))
                 address = wallet_data.get('address', 'Unknown')
                 
-                companies[company].append({
-                    'name': name,  # Output format uses 'name' for display
-                    'address': address,
-                    'key': wallet_key
-                })
+                companies[company].append(WalletRec(name, address, wallet_key))
                 total_count += 1
             
             # Sort companies and wallets for consistent display
             sorted_companies = {}
             for company in sorted(companies.keys()):
-                sorted_companies[company] = sorted(companies[company], key=lambda x: x['name'])
+                sorted_companies[company] = sorted(companies[company], key=lambda x: x.name)
             
             return True, {
                 'total_count': total_count,
@@ -104,7 +115,7 @@ class WalletService:
             }
             
         except Exception as e:
-            self.logger.error(f"Error listing wallets: {e}")
+            self.logger.error("Error listing wallets: %s", e)
             return False, f"Error loading wallet list: {str(e)}"
 
     async def add_wallet(self, company: str, name: str, address: str) -> Tuple[bool, str]:
@@ -121,21 +132,23 @@ class WalletService:
             if wallet_key in wallets:
                 return False, f"❌ **Wallet '{name}' already exists**"
             
-            # 2. Check if wallet name already exists (case-insensitive search through all entries)
-            for existing_key, existing_data in wallets.items():
-                # Handle both old format ('name') and new format ('wallet')
-                existing_name = existing_data.get('wallet', existing_data.get('name', existing_key))
-                if existing_name.lower() == name.lower():
-                    existing_company = existing_data.get('company', 'Unknown')
-                    return False, f"❌ **Wallet name '{name}' already exists in {existing_company}**"
+            # One scan builds both indexes for checks 2 and 3
+            by_name_lower, by_address = self._index_wallets(wallets)
+            
+            # 2. Check if wallet name already exists (case-insensitive)
+            existing_key = by_name_lower.get(name.lower())
+            if existing_key is not None:
+                existing_company = wallets[existing_key].get('company', 'Unknown')
+                return False, f"❌ **Wallet name '{name}' already exists in {existing_company}**"
             
             # 3. Check if address already exists
-            for existing_key, existing_data in wallets.items():
-                if existing_data.get('address') == address:
-                    # Handle both old format ('name') and new format ('wallet')
-                    existing_name = existing_data.get('wallet', existing_data.get('name', 'Unknown'))
-                    existing_company = existing_data.get('company', 'Unknown')
-                    return False, f"❌ **Address already used by '{existing_name}' in {existing_company}**"
+            existing_key = by_address.get(address)
+            if existing_key is not None:
+                existing_data = wallets[existing_key]
+                # Handle both old format ('name') and new format ('wallet')
+                existing_name = existing_data.get('wallet', existing_data.get('name', 'Unknown'))
+                existing_company = existing_data.get('company', 'Unknown')
+                return False, f"❌ **Address already used by '{existing_name}' in {existing_company}**"
             
             # Validate address format and existence on blockchain
             is_valid, validation_message = await self.tron_validator.validate_address(address)
@@ -152,13 +165,13 @@ class WalletService:
             
             # Save to file
             if self._save_wallets(wallets):
-                self.logger.info(f"Added wallet: {company} - {name}")
+                self.logger.info("Added wallet: %s - %s", company, name)
                 return True, f"✅ **Wallet added successfully!**\n\n🏢 **Company:** {company}\n📝 **Name:** {name}\n📍 **Address:** `{address}`"
             else:
                 return False, "❌ **Failed to save wallet data.**"
                 
         except Exception as e:
-            self.logger.error(f"Error adding wallet: {e}")
+            self.logger.error("Error adding wallet: %s", e)
             return False, f"❌ **Error adding wallet:** {str(e)}"
 
     def remove_wallet(self, wallet_name: str) -> Tuple[bool, str]:
@@ -196,13 +209,13 @@ class WalletService:
                 company = removed_wallet.get('company', 'Unknown')
                 # Get actual name from removed wallet
                 actual_name = removed_wallet.get('wallet', removed_wallet.get('name', wallet_name))
-                self.logger.info(f"Removed wallet: {company} - {actual_name}")
+                self.logger.info("Removed wallet: %s - %s", company, actual_name)
                 return True, f"✅ **Wallet removed successfully!**\n\n🏢 **Company:** {company}\n📝 **Name:** {actual_name}"
             else:
                 return False, "❌ **Failed to save wallet data.**"
                 
         except Exception as e:
-            self.logger.error(f"Error removing wallet: {e}")
+            self.logger.error("Error removing wallet: %s", e)
             return False, f"❌ **Error removing wallet:** {str(e)}"
 
     def get_wallet(self, wallet_name: str) -> Tuple[bool, Dict]:
@@ -229,7 +242,7 @@ class WalletService:
             return False, {}
             
         except Exception as e:
-            self.logger.error(f"Error getting wallet: {e}")
+            self.logger.error("Error getting wallet: %s", e)
             return False, {}
 
     def _get_current_time(self) -> str:
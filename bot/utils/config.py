@@ -5,101 +5,382 @@ Manages environment variables, validation, and production-safe logging setup
 """
 
 import os
+import atexit
+import copy
 import logging
 import logging.handlers
 import json
-import glob
-from typing import Dict, Any, Optional
-from datetime import datetime, timedelta
+import functools
+import hashlib
+import marshal
+import queue
+import re
+import shutil
+import threading
+import time
+from dataclasses import dataclass
+from types import MappingProxyType
+from typing import Dict, Any, FrozenSet, List, Mapping, Optional, Tuple, Union
 from pathlib import Path
-from dotenv import load_dotenv
 
-# Load environment variables from .env file
-load_dotenv()
+# orjson is optional: native-speed wallets.json (de)serialization, stdlib json otherwise
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+# Expected shape of wallets.json: {key: {"address": ..., "wallet"/"name": ..., "company": ...}}
+_WALLET_SCHEMA = {
+    "type": "object",
+    "additionalProperties": {
+        "type": "object",
+        "required": ["address"],
+        "properties": {
+            "address": {"type": "string", "minLength": 1},
+            "wallet": {"type": "string"},
+            "name": {"type": "string"},
+            "company": {"type": "string"},
+        },
+    },
+}
+
+# fastjsonschema is optional: compile the schema once into a plain Python validator
+try:
+    import fastjsonschema
+    _validate_wallets = fastjsonschema.compile(_WALLET_SCHEMA)
+except ImportError:
+    fastjsonschema = None
+    _validate_wallets = None
+
+def find_env_file() -> Optional[str]:
+    """Locate .env the way load_dotenv() does: walk up from this module's directory."""
+    if os.getenv("SKIP_DOTENV"):
+        return None
+    path = os.path.dirname(os.path.abspath(__file__))
+    while True:
+        candidate = os.path.join(path, ".env")
+        if os.path.isfile(candidate):
+            return candidate
+        parent = os.path.dirname(path)
+        if parent == path:
+            return None
+        path = parent
+
+def _load_env_file() -> None:
+    """
+    Load .env into os.environ without overriding variables that are already set.
+    
+    Parsed values are cached in a marshal sidecar (.env.cache, mode 0600) keyed by the
+    .env mtime and size, so restarts skip python-dotenv entirely while .env is unchanged.
+    """
+    env_path = find_env_file()
+    if env_path is None:
+        return
+    
+    st = os.stat(env_path)
+    cache_key = (st.st_mtime_ns, st.st_size)
+    cache_path = f"{env_path}.cache"
+    
+    values = None
+    try:
+        with open(cache_path, 'rb') as f:
+            cached_key, cached_values = marshal.load(f)
+        if cached_key == cache_key:
+            values = cached_values
+    except Exception:
+        pass  # Missing, stale-format or unreadable cache: re-parse below
+    
+    if values is None:
+        from dotenv import dotenv_values
+        values = {k: v for k, v in dotenv_values(env_path).items() if v is not None}
+        tmp_path = f"{cache_path}.tmp.{os.getpid()}"
+        try:
+            fd = os.open(tmp_path, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o600)
+            with os.fdopen(fd, 'wb') as f:
+                marshal.dump((cache_key, values), f)
+            os.replace(tmp_path, cache_path)
+        except OSError:
+            pass  # Cache is an optimization only
+    
+    for key, value in values.items():
+        os.environ.setdefault(key, value)
+
+# Load environment variables from .env file, unless the process already has them injected
+# (SKIP_DOTENV=1 also skips importing python-dotenv at all)
+_PROCESS_ENV_KEYS = frozenset(os.environ)
+if not os.getenv("SKIP_DOTENV"):
+    _load_env_file()
+
+def read_env_file_value(key: str) -> Optional[str]:
+    """
+    Re-read one setting from .env, for values that are reloaded while the bot runs.
+    
+    Returns None when .env is skipped or missing, when it lacks the key, or when the key
+    was injected by the process environment (which wins over .env, as it did at startup).
+    """
+    if key in _PROCESS_ENV_KEYS:
+        return None
+    env_path = find_env_file()
+    if env_path is None:
+        return None
+    from dotenv import dotenv_values
+    return dotenv_values(env_path).get(key)
+
+@dataclass(frozen=True)
+class ConfigValues:
+    """Immutable snapshot of every environment-derived setting, read once at import."""
+    __slots__ = (
+        "ENVIRONMENT", "LARK_APP_ID", "LARK_APP_SECRET", "LARK_CHAT_ID",
+        "LARK_TOPIC_QUICKGUIDE", "LARK_TOPIC_COMMANDS", "LARK_TOPIC_DAILYREPORT",
+        "LARK_TOPIC_QUICKGUIDE_MSG", "LARK_TOPIC_COMMANDS_MSG", "LARK_TOPIC_DAILYREPORT_MSG",
+        "LARK_AUTHORIZED_USERS", "POLL_INTERVAL", "COMMAND_PREFIX", "WALLETS_FILE", "LOG_LEVEL",
+        "TRON_API_KEY",
+    )
+    
+    ENVIRONMENT: str
+    LARK_APP_ID: Optional[str]
+    LARK_APP_SECRET: Optional[str]
+    LARK_CHAT_ID: Optional[str]
+    LARK_TOPIC_QUICKGUIDE: Optional[str]
+    LARK_TOPIC_COMMANDS: Optional[str]
+    LARK_TOPIC_DAILYREPORT: Optional[str]
+    LARK_TOPIC_QUICKGUIDE_MSG: Optional[str]
+    LARK_TOPIC_COMMANDS_MSG: Optional[str]
+    LARK_TOPIC_DAILYREPORT_MSG: Optional[str]
+    LARK_AUTHORIZED_USERS: FrozenSet[str]
+    POLL_INTERVAL: int
+    COMMAND_PREFIX: str
+    WALLETS_FILE: str
+    LOG_LEVEL: str
+    TRON_API_KEY: Optional[str]
+
+def _read_env() -> ConfigValues:
+    """Read all configuration environment variables in a single pass."""
+    getenv = os.getenv
+    return ConfigValues(
+        ENVIRONMENT=getenv("ENVIRONMENT", "development"),
+        LARK_APP_ID=getenv("LARK_APP_ID"),
+        LARK_APP_SECRET=getenv("LARK_APP_SECRET"),
+        LARK_CHAT_ID=getenv("LARK_CHAT_ID"),
+        LARK_TOPIC_QUICKGUIDE=getenv("LARK_TOPIC_QUICKGUIDE"),
+        LARK_TOPIC_COMMANDS=getenv("LARK_TOPIC_COMMANDS"),
+        LARK_TOPIC_DAILYREPORT=getenv("LARK_TOPIC_DAILYREPORT"),
+        LARK_TOPIC_QUICKGUIDE_MSG=getenv("LARK_TOPIC_QUICKGUIDE_MSG"),
+        LARK_TOPIC_COMMANDS_MSG=getenv("LARK_TOPIC_COMMANDS_MSG"),
+        LARK_TOPIC_DAILYREPORT_MSG=getenv("LARK_TOPIC_DAILYREPORT_MSG"),
+        LARK_AUTHORIZED_USERS=frozenset(
+            uid.strip() for uid in getenv("LARK_AUTHORIZED_USERS", "").split(",") if uid.strip()
+        ),
+        POLL_INTERVAL=int(getenv("POLL_INTERVAL", "30")),  # seconds
+        COMMAND_PREFIX=getenv("COMMAND_PREFIX", "/"),
+        WALLETS_FILE=getenv("WALLETS_FILE", "wallets.json"),
+        LOG_LEVEL=getenv("LOG_LEVEL", "INFO"),
+        TRON_API_KEY=getenv("TRON_API_KEY"),  # For wallet balance checking
+    )
+
+# Frozen environment snapshot shared by Config and any module that needs env values
+ENV = _read_env()
+
+def _copy_wallets(wallets: Dict[str, Any]) -> Dict[str, Any]:
+    """Copy wallets down to each entry so callers can't mutate the cached data."""
+    return {
+        key: dict(entry) if isinstance(entry, dict) else copy.deepcopy(entry)
+        for key, entry in wallets.items()
+    }
+
+def _wallets_path_candidates(default: str) -> Tuple[str, ...]:
+    """Locations searched for the wallets file, in order."""
+    return (
+        default,  # Current directory
+        f"../../{default}",  # Project root from bot/utils
+        f"../{default}",  # One level up
+    )
+
+@functools.lru_cache(maxsize=None)
+def _resolve_wallets_path(default: str) -> str:
+    """Resolve the wallets file location once per process (stats at most 3 paths)."""
+    # If not found, return the default
+    return next((path for path in _wallets_path_candidates(default) if os.path.isfile(path)), default)
+
+# Old daily files, rotated backups and backup files removed by _cleanup_old_logs
+_STALE_LOG_PATTERN = re.compile(r"lark_bot_.*\.log|.*\.log\.|.*\.backup\.")
+
+class _CachedTimeFormatter(logging.Formatter):
+    """Formatter that runs strftime once per second instead of once per record."""
+    
+    _cached_time: Tuple[int, str] = (-1, "")
+    
+    def formatTime(self, record: logging.LogRecord, datefmt: Optional[str] = None) -> str:
+        if not datefmt:
+            # The default format includes milliseconds, so it can't be shared
+            return super().formatTime(record, datefmt)
+        second = int(record.created)
+        cached = self._cached_time
+        if cached[0] != second:
+            cached = self._cached_time = (second, time.strftime(datefmt, self.converter(record.created)))
+        return cached[1]
+
+def _fsync_dir(path: str) -> None:
+    """Flush the directory entry for path so a rename survives a crash (no-op where unsupported)."""
+    try:
+        fd = os.open(os.path.dirname(os.path.abspath(path)), os.O_RDONLY)
+    except OSError:
+        return
+    try:
+        os.fsync(fd)
+    except OSError:
+        pass
+    finally:
+        os.close(fd)
 
 class Config:
     """Configuration management for Lark Bot."""
     
     # Environment
-    ENVIRONMENT = os.getenv("ENVIRONMENT", "development")
+    ENVIRONMENT = ENV.ENVIRONMENT
     
     # Lark API Configuration
-    LARK_APP_ID = os.getenv("LARK_APP_ID")
-    LARK_APP_SECRET = os.getenv("LARK_APP_SECRET")
-    LARK_CHAT_ID = os.getenv("LARK_CHAT_ID")
+    LARK_APP_ID = ENV.LARK_APP_ID
+    LARK_APP_SECRET = ENV.LARK_APP_SECRET
+    LARK_CHAT_ID = ENV.LARK_CHAT_ID
     
     # Topic Configuration
-    LARK_TOPIC_QUICKGUIDE = os.getenv("LARK_TOPIC_QUICKGUIDE")
-    LARK_TOPIC_COMMANDS = os.getenv("LARK_TOPIC_COMMANDS")
-    LARK_TOPIC_DAILYREPORT = os.getenv("LARK_TOPIC_DAILYREPORT")
+    LARK_TOPIC_QUICKGUIDE = ENV.LARK_TOPIC_QUICKGUIDE
+    LARK_TOPIC_COMMANDS = ENV.LARK_TOPIC_COMMANDS
+    LARK_TOPIC_DAILYREPORT = ENV.LARK_TOPIC_DAILYREPORT
     
     # Topic Message IDs (for replies)
-    LARK_TOPIC_QUICKGUIDE_MSG = os.getenv("LARK_TOPIC_QUICKGUIDE_MSG")
-    LARK_TOPIC_COMMANDS_MSG = os.getenv("LARK_TOPIC_COMMANDS_MSG")
-    LARK_TOPIC_DAILYREPORT_MSG = os.getenv("LARK_TOPIC_DAILYREPORT_MSG")
+    LARK_TOPIC_QUICKGUIDE_MSG = ENV.LARK_TOPIC_QUICKGUIDE_MSG
+    LARK_TOPIC_COMMANDS_MSG = ENV.LARK_TOPIC_COMMANDS_MSG
+    LARK_TOPIC_DAILYREPORT_MSG = ENV.LARK_TOPIC_DAILYREPORT_MSG
+    
+    # Authorization (comma-separated Open IDs; empty allows everyone)
+    LARK_AUTHORIZED_USERS = ENV.LARK_AUTHORIZED_USERS
     
     # Bot Configuration
-    POLL_INTERVAL = int(os.getenv("POLL_INTERVAL", "30"))  # seconds
-    COMMAND_PREFIX = os.getenv("COMMAND_PREFIX", "/")
+    POLL_INTERVAL = ENV.POLL_INTERVAL  # seconds
+    COMMAND_PREFIX = ENV.COMMAND_PREFIX
     
     # File Paths
-    WALLETS_FILE = os.getenv("WALLETS_FILE", "wallets.json")
-    LOG_LEVEL = os.getenv("LOG_LEVEL", "INFO")
+    WALLETS_FILE = ENV.WALLETS_FILE
+    LOG_LEVEL = ENV.LOG_LEVEL
     
     # API Configuration
-    TRON_API_KEY = os.getenv("TRON_API_KEY")  # For wallet balance checking
+    TRON_API_KEY = ENV.TRON_API_KEY  # For wallet balance checking
+    
+    # Read-only topic mapping, built once from the values above
+    _TOPIC_CONFIG = MappingProxyType({
+        "quickguide": MappingProxyType({
+            "thread_id": LARK_TOPIC_QUICKGUIDE,
+            "message_id": LARK_TOPIC_QUICKGUIDE_MSG,
+            "chat_id": LARK_CHAT_ID
+        }),
+        "commands": MappingProxyType({
+            "thread_id": LARK_TOPIC_COMMANDS,
+            "message_id": LARK_TOPIC_COMMANDS_MSG,
+            "chat_id": LARK_CHAT_ID
+        }),
+        "dailyreport": MappingProxyType({
+            "thread_id": LARK_TOPIC_DAILYREPORT,
+            "message_id": LARK_TOPIC_DAILYREPORT_MSG,
+            "chat_id": LARK_CHAT_ID
+        })
+    })
+    
+    # Settings that must be non-empty for the bot to start (checked by validate_config)
+    _REQUIRED = (
+        "LARK_APP_ID",
+        "LARK_APP_SECRET",
+        "LARK_CHAT_ID",
+        "LARK_TOPIC_COMMANDS",
+        "LARK_TOPIC_DAILYREPORT",
+        "LARK_TOPIC_COMMANDS_MSG",
+        "LARK_TOPIC_DAILYREPORT_MSG",
+    )
+    
+    # Format used by get_current_time()
+    TIME_FORMAT = "%Y-%m-%d %H:%M:%S"
+    
+    # Number of rotated wallets backups kept (wallets.json.bak.0 is the newest)
+    WALLETS_BACKUP_COUNT = 3
+    
+    # Parsed wallets cache: (path, st_mtime_ns, st_size, wallets)
+    _wallets_cache: Optional[Tuple[str, int, int, Dict[str, Any]]] = None
+    
+    # Last write by save_wallets: (payload digest, st_mtime_ns, st_size)
+    _last_saved: Optional[Tuple[bytes, int, int]] = None
+    
+    # Static get_config_summary() lines: (before logging line, after logging line)
+    _summary_lines: Optional[Tuple[Tuple[str, ...], Tuple[str, ...]]] = None
+    
+    # Background thread draining the log queue into the real handlers
+    _log_listener: Optional[logging.handlers.QueueListener] = None
+    _queue_handler: Optional[logging.handlers.QueueHandler] = None
+    
+    # Set once logs/ has been created by setup_logging()
+    _logs_dir_ready = False
+    
+    # True while the listener is running the handlers built by setup_logging()
+    _file_logging_ready = False
     
     @classmethod
     def _find_wallets_file(cls) -> str:
-        """Find wallets.json file in current directory or project root."""
-        possible_paths = [
-            cls.WALLETS_FILE,  # Current directory
-            f"../../{cls.WALLETS_FILE}",  # Project root from bot/utils
-            f"../{cls.WALLETS_FILE}",  # One level up
-        ]
-        
-        for path in possible_paths:
-            if os.path.exists(path):
-                return path
-        
-        # If not found, return the default
-        return cls.WALLETS_FILE
+        """Find wallets.json file in current directory or project root (memoized)."""
+        return _resolve_wallets_path(cls.WALLETS_FILE)
     
     @classmethod
-    def validate_config(cls) -> bool:
+    def invalidate_wallets_path_cache(cls) -> None:
+        """Forget the resolved wallets path so the next lookup searches the disk again."""
+        _resolve_wallets_path.cache_clear()
+    
+    @classmethod
+    def is_user_authorized(cls, user_id: str) -> bool:
+        """Check a sender's Open ID against LARK_AUTHORIZED_USERS (empty set allows all)."""
+        return not cls.LARK_AUTHORIZED_USERS or user_id in cls.LARK_AUTHORIZED_USERS
+    
+    @classmethod
+    def validate_config(cls, as_json: bool = False) -> Union[bool, Dict[str, Any]]:
         """
         Validate that all required configuration is present.
         
+        Args:
+            as_json: Return a structured report instead of logging and raising
+            
         Returns:
-            True if configuration is valid, raises exception if not
+            True if configuration is valid, raises exception if not. With
+            as_json=True, a {"ok", "missing", "warnings", "errors"} report
+            and nothing is raised.
         """
-        required_vars = {
-            "LARK_APP_ID": cls.LARK_APP_ID,
-            "LARK_APP_SECRET": cls.LARK_APP_SECRET,
-            "LARK_CHAT_ID": cls.LARK_CHAT_ID,
-            "LARK_TOPIC_COMMANDS": cls.LARK_TOPIC_COMMANDS,
-            "LARK_TOPIC_DAILYREPORT": cls.LARK_TOPIC_DAILYREPORT,
-            "LARK_TOPIC_COMMANDS_MSG": cls.LARK_TOPIC_COMMANDS_MSG,
-            "LARK_TOPIC_DAILYREPORT_MSG": cls.LARK_TOPIC_DAILYREPORT_MSG,
+        report = {
+            "missing": [name for name in cls._REQUIRED if not getattr(cls, name)],
+            "warnings": [],
+            "errors": [],
         }
         
-        missing_vars = []
-        for var_name, var_value in required_vars.items():
-            if not var_value:
-                missing_vars.append(var_name)
-        
-        if missing_vars:
-            error_msg = f"Missing required environment variables: {', '.join(missing_vars)}"
-            logging.error(f"❌ Configuration Error: {error_msg}")
+        if report["missing"] and not as_json:
+            error_msg = f"Missing required environment variables: {', '.join(report['missing'])}"
+            logging.error("❌ Configuration Error: %s", error_msg)
             raise ValueError(error_msg)
         
         # Validate wallets file exists
         wallets_path = cls._find_wallets_file()
         if not os.path.exists(wallets_path):
-            error_msg = f"Wallets file not found: {wallets_path} (searched: {cls.WALLETS_FILE}, ../../{cls.WALLETS_FILE}, ../{cls.WALLETS_FILE})"
-            logging.error(f"❌ Configuration Error: {error_msg}")
-            raise FileNotFoundError(error_msg)
-        
+            searched = ", ".join(_wallets_path_candidates(cls.WALLETS_FILE))
+            error_msg = f"Wallets file not found: {wallets_path} (searched: {searched})"
+            if not as_json:
+                logging.error("❌ Configuration Error: %s", error_msg)
+                raise FileNotFoundError(error_msg)
+            report["errors"].append(error_msg)
+        
+        if not cls.LARK_AUTHORIZED_USERS:
+            report["warnings"].append("LARK_AUTHORIZED_USERS is empty: every user is authorized")
+        
+        if as_json:
+            report["ok"] = not report["missing"] and not report["errors"]
+            return report
+        
+        for warning in report["warnings"]:
+            logging.warning("⚠️ %s", warning)
         logging.info("✅ Configuration validation passed")
         return True
     
@@ -111,57 +392,155 @@ class Config:
         Returns:
             Dictionary of wallet configurations
         """
+        wallets_path = cls._find_wallets_file()
+        
+        # One stat covers both the existence check and the cache key
         try:
-            wallets_path = cls._find_wallets_file()
-            with open(wallets_path, 'r') as f:
-                wallets = json.load(f)
+            st = os.stat(wallets_path)
+        except FileNotFoundError:
+            logging.error("❌ Wallets file not found: %s", wallets_path)
+            return {}
+        
+        try:
+            # Serve a copy of the cached dict while the file is unchanged on disk
+            cached = cls._wallets_cache
+            if cached and cached[:3] == (wallets_path, st.st_mtime_ns, st.st_size):
+                return _copy_wallets(cached[3])
+            
+            if orjson is not None:
+                with open(wallets_path, 'rb') as f:
+                    wallets = orjson.loads(f.read())
+            else:
+                with open(wallets_path, 'r') as f:
+                    wallets = json.load(f)
             
             if not wallets:
                 logging.warning("⚠️ No wallets configured in wallets.json")
                 return {}
             
-            logging.info(f"✅ Loaded {len(wallets)} wallets from {wallets_path}")
+            if _validate_wallets is not None:
+                try:
+                    _validate_wallets(wallets)
+                except fastjsonschema.JsonSchemaException as e:
+                    logging.error("❌ Invalid wallets file %s: %s", wallets_path, e.message)
+                    return {}
+            
+            # The cache keeps its own copy; edits to the returned dict can't leak into it
+            cls._wallets_cache = (wallets_path, st.st_mtime_ns, st.st_size, _copy_wallets(wallets))
+            logging.info("✅ Loaded %d wallets from %s", len(wallets), wallets_path)
             return wallets
             
         except FileNotFoundError:
-            logging.error(f"❌ Wallets file not found: {cls._find_wallets_file()}")
+            # Removed between the stat and the open
+            logging.error("❌ Wallets file not found: %s", wallets_path)
             return {}
         except json.JSONDecodeError as e:
-            logging.error(f"❌ Invalid JSON in wallets file: {e}")
+            logging.error("❌ Invalid JSON in wallets file: %s", e)
             return {}
         except Exception as e:
-            logging.error(f"❌ Error loading wallets: {e}")
+            logging.error("❌ Error loading wallets: %s", e)
             return {}
     
     @classmethod
-    def save_wallets(cls, wallets: Dict[str, Any]) -> bool:
+    def clear_wallet_cache(cls) -> None:
+        """Drop the cached wallets so the next load_wallets() re-reads the file."""
+        cls._wallets_cache = None
+    
+    @classmethod
+    def save_wallets(cls, wallets: Dict[str, Any], wallets_path: Optional[str] = None) -> bool:
         """
         Save wallet configuration to JSON file.
         
         Args:
             wallets: Dictionary of wallet configurations
+            wallets_path: File to write (defaults to the resolved wallets.json)
             
         Returns:
             True if saved successfully, False otherwise
         """
+        if wallets_path is None:
+            wallets_path = cls._find_wallets_file()
+        tmp_file = f"{wallets_path}.tmp.{os.getpid()}"
         try:
-            # Create backup of existing file
-            if os.path.exists(cls.WALLETS_FILE):
-                backup_file = f"{cls.WALLETS_FILE}.backup.{int(datetime.now().timestamp())}"
-                os.rename(cls.WALLETS_FILE, backup_file)
-                logging.info(f"📄 Created backup: {backup_file}")
+            # Compact in production (smaller file, faster reload); indented elsewhere for hand edits
+            compact = cls.ENVIRONMENT.upper() == "PRODUCTION"
+            if orjson is not None:
+                payload = orjson.dumps(wallets, option=0 if compact else orjson.OPT_INDENT_2)
+            elif compact:
+                payload = json.dumps(wallets, separators=(',', ':')).encode('utf-8')
+            else:
+                payload = json.dumps(wallets, indent=2).encode('utf-8')
             
-            # Save new configuration
-            with open(cls.WALLETS_FILE, 'w') as f:
-                json.dump(wallets, f, indent=2)
+            # Skip the write entirely if this exact payload is already on disk
+            digest = hashlib.blake2b(payload, digest_size=16).digest()
+            last = cls._last_saved
+            if last and last[0] == digest:
+                try:
+                    st = os.stat(wallets_path)
+                    if (st.st_mtime_ns, st.st_size) == last[1:]:
+                        logging.info("✅ Wallets unchanged, skipped saving %s", wallets_path)
+                        return True
+                except FileNotFoundError:
+                    pass
             
-            logging.info(f"✅ Saved {len(wallets)} wallets to {cls.WALLETS_FILE}")
+            # Write the new configuration to a temp file and make it durable first
+            with open(tmp_file, 'wb') as f:
+                f.write(payload)
+                f.flush()
+                os.fsync(f.fileno())
+            
+            # Keep a bounded ring of backups of the current file
+            existed = os.path.exists(wallets_path)
+            if existed:
+                backup_file = cls._rotate_wallet_backups(wallets_path)
+                logging.info("📄 Created backup: %s", backup_file)
+            
+            # Atomically publish the new file (wallets.json is never missing)
+            os.replace(tmp_file, wallets_path)
+            _fsync_dir(wallets_path)
+            cls.clear_wallet_cache()
+            if not existed:
+                # The memoized lookup may have fallen back before this file existed
+                cls.invalidate_wallets_path_cache()
+            st = os.stat(wallets_path)
+            cls._last_saved = (digest, st.st_mtime_ns, st.st_size)
+            
+            logging.info("✅ Saved %d wallets to %s", len(wallets), wallets_path)
             return True
             
         except Exception as e:
-            logging.error(f"❌ Error saving wallets: {e}")
+            logging.error("❌ Error saving wallets: %s", e)
+            try:
+                os.remove(tmp_file)
+            except OSError:
+                pass
             return False
     
+    @classmethod
+    def _rotate_wallet_backups(cls, wallets_path: str) -> str:
+        """
+        Shift wallets.json.bak.N up by one (dropping the oldest) and back up the current file.
+        
+        Args:
+            wallets_path: Resolved path of the wallets file being replaced
+            
+        Returns:
+            Path of the newest backup (wallets.json.bak.0)
+        """
+        base = f"{wallets_path}.bak"
+        for i in range(cls.WALLETS_BACKUP_COUNT - 1, 0, -1):
+            older = f"{base}.{i - 1}"
+            if os.path.exists(older):
+                os.replace(older, f"{base}.{i}")
+        
+        backup_file = f"{base}.0"
+        try:
+            # Hard link keeps the old inode alive without copying bytes
+            os.link(wallets_path, backup_file)
+        except OSError:
+            shutil.copy2(wallets_path, backup_file)
+        return backup_file
+    
     @classmethod
     def setup_logging(cls) -> logging.Logger:
         """
@@ -170,25 +549,37 @@ class Config:
         Returns:
             Configured logger instance
         """
-        # Create logs directory if it doesn't exist
-        logs_dir = Path("logs")
-        logs_dir.mkdir(exist_ok=True)
-        
         # Configure logging level
         log_level = getattr(logging, cls.LOG_LEVEL.upper(), logging.INFO)
         
+        # Already initialized (tests, reloads): keep the running listener and handlers
+        root_logger = logging.getLogger()
+        if (cls._file_logging_ready
+                and root_logger.level == log_level
+                and root_logger.handlers == [cls._queue_handler]):
+            return logging.getLogger("lark_bot")
+        
+        # Create logs directory if it doesn't exist (once per process)
+        logs_dir = Path("logs")
+        if not cls._logs_dir_ready:
+            logs_dir.mkdir(exist_ok=True)
+            cls._logs_dir_ready = True
+        
         # Create production-safe formatter
-        formatter = logging.Formatter(
+        formatter = _CachedTimeFormatter(
             '%(asctime)s - %(name)s - %(levelname)s - %(message)s',
             datefmt='%Y-%m-%d %H:%M:%S'
         )
         
         # Setup root logger
-        root_logger = logging.getLogger()
         root_logger.setLevel(log_level)
         
         # Clear existing handlers to avoid duplicates
         root_logger.handlers.clear()
+        cls.stop_logging()
+        
+        # Handlers run on the queue listener thread, not on the caller's (event loop) thread
+        handlers = []
         
         # 1. Console handler (only in development)
         environment = cls.ENVIRONMENT.upper()
@@ -196,7 +587,7 @@ class Config:
             console_handler = logging.StreamHandler()
             console_handler.setLevel(log_level)
             console_handler.setFormatter(formatter)
-            root_logger.addHandler(console_handler)
+            handlers.append(console_handler)
         
         # 2. Main rotating file handler (production-safe)
         log_file = logs_dir / "lark_bot.log"
@@ -206,11 +597,12 @@ class Config:
             filename=log_file,
             maxBytes=5 * 1024 * 1024,  # 5MB per file
             backupCount=20,            # Keep 20 backup files (5MB x 20 = 100MB max)
-            encoding='utf-8'
+            encoding='utf-8',
+            delay=True                 # Open the file on the first record, not at startup
         )
         main_handler.setLevel(log_level)
         main_handler.setFormatter(formatter)
-        root_logger.addHandler(main_handler)
+        handlers.append(main_handler)
         
         # 3. Error-only file handler (for critical issues)
         error_log_file = logs_dir / "lark_bot_errors.log"
@@ -218,26 +610,70 @@ class Config:
             filename=error_log_file,
             maxBytes=2 * 1024 * 1024,  # 2MB for errors
             backupCount=5,             # Keep 5 error log backups (2MB x 5 = 10MB max)
-            encoding='utf-8'
+            encoding='utf-8',
+            delay=True                 # Most runs never log an error; don't create the file up front
         )
         error_handler.setLevel(logging.ERROR)
         error_handler.setFormatter(formatter)
-        root_logger.addHandler(error_handler)
+        handlers.append(error_handler)
+        
+        # Producers only enqueue records; the listener thread does the disk I/O
+        cls._start_log_listener(root_logger, handlers)
+        cls._file_logging_ready = True
         
-        # 4. Cleanup old log files on startup
-        cls._cleanup_old_logs(logs_dir)
+        # 4. Cleanup old log files in the background so startup doesn't wait on the scan
+        threading.Thread(
+            target=cls._cleanup_old_logs, args=(logs_dir,), name="log-cleanup", daemon=True
+        ).start()
         
         # Create bot-specific logger
         logger = logging.getLogger("lark_bot")
-        logger.info(f"🔧 Production-safe logging initialized:")
-        logger.info(f"   Environment: {environment}")
-        logger.info(f"   Log Level: {cls.LOG_LEVEL}")
-        logger.info(f"   Main Log: {log_file} (5MB x 20 files = 100MB max)")
-        logger.info(f"   Error Log: {error_log_file} (2MB x 5 files = 10MB max)")
-        logger.info(f"   Total Limit: ~110MB maximum")
+        logger.info("🔧 Production-safe logging initialized:")
+        logger.info("   Environment: %s", environment)
+        logger.info("   Log Level: %s", cls.LOG_LEVEL)
+        logger.info("   Main Log: %s (5MB x 20 files = 100MB max)", log_file)
+        logger.info("   Error Log: %s (2MB x 5 files = 10MB max)", error_log_file)
+        logger.info("   Total Limit: ~110MB maximum")
         
         return logger
     
+    @classmethod
+    def _start_log_listener(cls, root_logger: logging.Logger, handlers: List[logging.Handler]) -> None:
+        """Attach a QueueHandler to the root logger and drain it into handlers on a background thread."""
+        log_queue = queue.SimpleQueue()
+        cls._queue_handler = logging.handlers.QueueHandler(log_queue)
+        root_logger.addHandler(cls._queue_handler)
+        cls._log_listener = logging.handlers.QueueListener(
+            log_queue, *handlers, respect_handler_level=True
+        )
+        cls._log_listener.start()
+    
+    @classmethod
+    def queue_root_handlers(cls) -> None:
+        """
+        Move the root logger's current handlers (e.g. from logging.basicConfig) behind
+        a QueueListener, so logging from the event loop never blocks on stream I/O.
+        """
+        root_logger = logging.getLogger()
+        handlers = [h for h in root_logger.handlers if h is not cls._queue_handler]
+        if not handlers:
+            return
+        root_logger.handlers.clear()
+        cls.stop_logging()
+        cls._start_log_listener(root_logger, handlers)
+    
+    @classmethod
+    def stop_logging(cls) -> None:
+        """Flush queued log records and close the handlers started by setup_logging()."""
+        listener = cls._log_listener
+        if listener is None:
+            return
+        cls._log_listener = None
+        cls._file_logging_ready = False
+        listener.stop()
+        for handler in listener.handlers:
+            handler.close()
+    
     @classmethod
     def _cleanup_old_logs(cls, logs_dir: Path):
         """
@@ -248,49 +684,49 @@ class Config:
         """
         try:
             # Delete files older than 30 days
-            cutoff_date = datetime.now() - timedelta(days=30)
+            cutoff = time.time() - 30 * 24 * 3600
             old_files_deleted = 0
+            total_size = 0
             
-            # Find all log files (including old daily files and backups)
-            log_patterns = [
-                "lark_bot_*.log*",  # Old daily files
-                "*.log.*",          # Rotated backup files
-                "*.backup.*"        # Backup files
-            ]
-            
-            for pattern in log_patterns:
-                for log_file in logs_dir.glob(pattern):
-                    if log_file.is_file():
-                        try:
-                            file_time = datetime.fromtimestamp(log_file.stat().st_mtime)
-                            if file_time < cutoff_date:
-                                log_file.unlink()
-                                old_files_deleted += 1
-                        except Exception as e:
-                            logging.warning(f"⚠️ Could not delete old log file {log_file}: {e}")
+            # One pass: delete stale old daily/rotated/backup files, size up the rest
+            for name, st in cls._scan_log_dir(logs_dir):
+                if _STALE_LOG_PATTERN.match(name) and st.st_mtime < cutoff:
+                    try:
+                        os.unlink(logs_dir / name)
+                        old_files_deleted += 1
+                        continue
+                    except OSError as e:
+                        logging.warning("⚠️ Could not delete old log file %s: %s", name, e)
+                total_size += st.st_size
             
             if old_files_deleted > 0:
-                logging.info(f"🗑️ Cleaned up {old_files_deleted} old log files")
+                logging.info("🗑️ Cleaned up %d old log files", old_files_deleted)
             
-            # Check and report current log directory size
-            total_size = cls._get_directory_size(logs_dir)
+            # Report current log directory size
             total_size_mb = total_size / (1024 * 1024)
-            logging.info(f"📊 Log directory size: {total_size_mb:.1f}MB")
+            logging.info("📊 Log directory size: %.1fMB", total_size_mb)
             
         except Exception as e:
-            logging.error(f"❌ Error during log cleanup: {e}")
+            logging.error("❌ Error during log cleanup: %s", e)
+    
+    @classmethod
+    def _scan_log_dir(cls, logs_dir: Path) -> List[Tuple[str, os.stat_result]]:
+        """List the files in logs_dir with their stat results in a single scandir pass."""
+        files = []
+        with os.scandir(logs_dir) as entries:
+            for entry in entries:
+                if entry.is_file():
+                    files.append((entry.name, entry.stat()))
+        return files
     
     @classmethod
     def _get_directory_size(cls, directory: Path) -> int:
         """Get total size of directory in bytes."""
-        total_size = 0
         try:
-            for file_path in directory.rglob('*'):
-                if file_path.is_file():
-                    total_size += file_path.stat().st_size
+            return sum(st.st_size for _, st in cls._scan_log_dir(directory))
         except Exception as e:
-            logging.warning(f"⚠️ Error calculating directory size: {e}")
-        return total_size
+            logging.warning("⚠️ Error calculating directory size: %s", e)
+            return 0
     
     @classmethod
     def get_log_status(cls) -> Dict[str, Any]:
@@ -300,20 +736,19 @@ class Config:
         if not logs_dir.exists():
             return {"status": "No logs directory found"}
         
-        # Count files and calculate sizes
-        log_files = list(logs_dir.glob("*.log*"))
+        # Count files and calculate sizes from one directory scan
+        files = cls._scan_log_dir(logs_dir)
+        log_files = [(st.st_mtime, name) for name, st in files if ".log" in name]
         total_files = len(log_files)
-        total_size = cls._get_directory_size(logs_dir)
+        total_size = sum(st.st_size for _, st in files)
         total_size_mb = total_size / (1024 * 1024)
         
         # Find newest and oldest files
         newest_file = None
         oldest_file = None
         if log_files:
-            files_with_time = [(f.stat().st_mtime, f) for f in log_files]
-            files_with_time.sort(key=lambda x: x[0])
-            oldest_file = files_with_time[0][1].name
-            newest_file = files_with_time[-1][1].name
+            oldest_file = min(log_files)[1]
+            newest_file = max(log_files)[1]
         
         return {
             "status": "Active",
@@ -326,30 +761,14 @@ class Config:
         }
     
     @classmethod
-    def get_topic_config(cls) -> Dict[str, Dict[str, str]]:
+    def get_topic_config(cls) -> Mapping[str, Mapping[str, Optional[str]]]:
         """
         Get topic configuration mapping.
         
         Returns:
-            Dictionary mapping topic names to their IDs and message IDs
+            Read-only mapping of topic names to their IDs and message IDs
         """
-        return {
-            "quickguide": {
-                "thread_id": cls.LARK_TOPIC_QUICKGUIDE,
-                "message_id": cls.LARK_TOPIC_QUICKGUIDE_MSG,
-                "chat_id": cls.LARK_CHAT_ID
-            },
-            "commands": {
-                "thread_id": cls.LARK_TOPIC_COMMANDS,
-                "message_id": cls.LARK_TOPIC_COMMANDS_MSG,
-                "chat_id": cls.LARK_CHAT_ID
-            },
-            "dailyreport": {
-                "thread_id": cls.LARK_TOPIC_DAILYREPORT,
-                "message_id": cls.LARK_TOPIC_DAILYREPORT_MSG,
-                "chat_id": cls.LARK_CHAT_ID
-            }
-        }
+        return cls._TOPIC_CONFIG
     
     @classmethod
     def get_config_summary(cls) -> str:
@@ -359,36 +778,55 @@ class Config:
         Returns:
             Formatted configuration summary
         """
-        summary = []
-        summary.append("🔧 Lark Bot Configuration Summary")
-        summary.append(f"Environment: {cls.ENVIRONMENT}")
-        summary.append(f"App ID: {cls.LARK_APP_ID[:10]}..." if cls.LARK_APP_ID else "App ID: Not set")
-        summary.append(f"Chat ID: {cls.LARK_CHAT_ID}")
-        summary.append(f"Poll Interval: {cls.POLL_INTERVAL}s")
-        summary.append(f"Command Prefix: {cls.COMMAND_PREFIX}")
-        summary.append(f"Wallets File: {cls.WALLETS_FILE}")
-        summary.append(f"Log Level: {cls.LOG_LEVEL}")
-        
-        # Logging info
+        head, tail = cls._summary_lines or cls._build_summary()
+        
+        # Logging info is the only live part of the summary
         log_status = cls.get_log_status()
-        summary.append(f"Logging: {log_status.get('total_size_mb', 0):.1f}MB / {log_status.get('limit_mb', 110)}MB limit")
+        logging_line = f"Logging: {log_status.get('total_size_mb', 0):.1f}MB / {log_status.get('limit_mb', 110)}MB limit"
+        
+        return "\n".join((*head, logging_line, *tail))
+    
+    @classmethod
+    def _build_summary(cls) -> Tuple[Tuple[str, ...], Tuple[str, ...]]:
+        """Format the static summary lines once; config does not change after import."""
+        head = [
+            "🔧 Lark Bot Configuration Summary",
+            f"Environment: {cls.ENVIRONMENT}",
+            f"App ID: {cls.LARK_APP_ID[:10]}..." if cls.LARK_APP_ID else "App ID: Not set",
+            f"Chat ID: {cls.LARK_CHAT_ID}",
+            f"Poll Interval: {cls.POLL_INTERVAL}s",
+            f"Command Prefix: {cls.COMMAND_PREFIX}",
+            f"Wallets File: {cls.WALLETS_FILE}",
+            f"Log Level: {cls.LOG_LEVEL}",
+        ]
         
         # Topic configuration
-        topics = cls.get_topic_config()
-        summary.append("Topics:")
-        for name, config in topics.items():
-            summary.append(f"  - {name}: thread={config.get('thread_id', 'None')[:10]}..., msg={config.get('message_id', 'None')[:10]}..., chat={config.get('chat_id', 'None')[:10]}...")
+        tail = ["Topics:"]
+        for name, config in cls.get_topic_config().items():
+            thread_id = (config.get('thread_id') or 'None')[:10]
+            message_id = (config.get('message_id') or 'None')[:10]
+            chat_id = (config.get('chat_id') or 'None')[:10]
+            tail.append(f"  - {name}: thread={thread_id}..., msg={message_id}..., chat={chat_id}...")
         
         # Authorization note
-        summary.append("Authorization: Handled by handler_registry.py (ALLOWED_USERS)")
+        tail.append(f"Authorization: {len(cls.LARK_AUTHORIZED_USERS)} authorized users (LARK_AUTHORIZED_USERS)")
         
-        return "\n".join(summary)
+        cls._summary_lines = (tuple(head), tuple(tail))
+        return cls._summary_lines
+
+    @classmethod
+    def invalidate_summary_cache(cls) -> None:
+        """Rebuild the static summary lines on the next get_config_summary() call."""
+        cls._summary_lines = None
 
     @classmethod
     def get_current_time(cls) -> str:
         """Get current time as formatted string."""
-        return datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+        return time.strftime(cls.TIME_FORMAT)
+
 
+# Make sure queued log records reach disk on interpreter exit
+atexit.register(Config.stop_logging)
 
 # Testing functions
 def test_config_validation():
@@ -541,8 +979,16 @@ if __name__ == "__main__":
             monitor_log_health()
         elif sys.argv[1] == "test":
             run_all_tests()
+        elif sys.argv[1] == "--check":
+            # Machine-readable dry run for CI: python -m bot.utils.config --check
+            report = Config.validate_config(as_json=True)
+            if orjson is not None:
+                print(orjson.dumps(report).decode())
+            else:
+                print(json.dumps(report, ensure_ascii=False))
+            sys.exit(0 if report["ok"] else 1)
         else:
-            print("Usage: python config.py [status|test]")
+            print("Usage: python config.py [status|test|--check]")
     else:
         # Show configuration summary
         try:
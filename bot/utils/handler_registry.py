@@ -7,20 +7,67 @@ FIXED: Unknown command now shows as rich card instead of plain text
 
 import logging
 import asyncio
+import functools
 import os
-from typing import Dict, Any, Optional, Callable, List
+import sys
+import time
+from collections import defaultdict, deque
+from typing import Deque, Dict, Any, Optional, Callable, FrozenSet, List, Tuple
 from abc import ABC, abstractmethod
 from dataclasses import dataclass
-from datetime import datetime
-from dotenv import load_dotenv
 
-# Load environment variables from .env
-load_dotenv()
+# Importing config loads .env and parses LARK_AUTHORIZED_USERS once
+from bot.utils.config import Config, find_env_file, read_env_file_value
 
 logger = logging.getLogger(__name__)
 
+def reload_allowed_users() -> FrozenSet[str]:
+    """Re-read LARK_AUTHORIZED_USERS from the environment (e.g. from a SIGHUP handler)."""
+    Config.LARK_AUTHORIZED_USERS = frozenset(
+        uid.strip() for uid in os.getenv("LARK_AUTHORIZED_USERS", "").split(",") if uid.strip()
+    )
+    Config.invalidate_summary_cache()
+    logger.info("🔄 Reloaded authorized users: %d configured", len(Config.LARK_AUTHORIZED_USERS))
+    return Config.LARK_AUTHORIZED_USERS
+
+# .env file and the st_mtime_ns it had when LARK_AUTHORIZED_USERS was last read
+_ENV_FILE = find_env_file()
+try:
+    _env_mtime_ns = os.stat(_ENV_FILE).st_mtime_ns if _ENV_FILE else 0
+except OSError:
+    _env_mtime_ns = 0
+
+def _refresh_allowed_users() -> None:
+    """Reload authorized users when .env has been edited since it was last read."""
+    global _env_mtime_ns
+    if _ENV_FILE is None:
+        return
+    try:
+        mtime_ns = os.stat(_ENV_FILE).st_mtime_ns
+    except OSError:
+        return
+    if mtime_ns == _env_mtime_ns:
+        return
+    _env_mtime_ns = mtime_ns
+    try:
+        value = read_env_file_value("LARK_AUTHORIZED_USERS")
+        if value is None:
+            # Not set in .env (or injected by the environment): keep the current set,
+            # since an empty allowlist would let every user through
+            return
+        os.environ["LARK_AUTHORIZED_USERS"] = value
+        reload_allowed_users()
+    except Exception as e:
+        logger.error("❌ Error reloading authorized users from %s: %s", _ENV_FILE, e)
+
 @dataclass
 class CommandContext:
+    # Created per command; explicit slots since dataclass(slots=True) needs Python 3.10
+    __slots__ = (
+        'message', 'command', 'args', 'sender_id', 'chat_id',
+        'thread_id', 'topic_manager', 'api_client', 'config',
+    )
+
     message: Any
     command: str
     args: List[str]
@@ -44,9 +91,12 @@ class BaseHandler(ABC):
 
     def add_alias(self, alias: str) -> 'BaseHandler':
         self.aliases.append(alias)
+        self.__dict__.pop('help_text', None)  # Re-render with the new alias
         return self
 
-    def get_help_text(self) -> str:
+    @functools.cached_property
+    def help_text(self) -> str:
+        # Rendered once: name/description/usage/aliases are fixed after construction
         help_text = f"**/{self.name}**"
         if self.aliases:
             help_text += f" (aliases: {', '.join(self.aliases)})"
@@ -55,277 +105,232 @@ class BaseHandler(ABC):
             help_text += f"\n**Usage:** {self.usage}"
         return help_text
 
+    def get_help_text(self) -> str:
+        return self.help_text
+
+# Rich-card building blocks. The shared dicts are only ever serialized, never
+# mutated, so error paths build just the outer card and its elements list.
+def _md(content: str) -> dict:
+    return {"tag": "div", "text": {"tag": "lark_md", "content": content}}
+
+def _header(template: str, title: str) -> dict:
+    return {"template": template, "title": {"tag": "plain_text", "content": title}}
+
+def _card(config: dict, header: dict, elements: List[dict]) -> dict:
+    return {"config": config, "header": header, "elements": elements}
+
+_CARD_CONFIG = {"wide_screen_mode": True, "enable_forward": False}
+_CARD_CONFIG_FORWARD = {"wide_screen_mode": True, "enable_forward": True}
+_HR = {"tag": "hr"}
+
+_UNKNOWN_HEADER = _header("orange", "❓ Unknown Command")
+_UNKNOWN_FOOTER = _md("Use **/help** for detailed information.")
+
+_ERROR_HEADER = _header("red", "💥 Command Error")
+_ERROR_TITLE = _md("💥 **Command Error**")
+_ERROR_FOOTER = _md("Please try again or contact support if the issue persists.")
+
+_ACCESS_DENIED_HEADER = _header("red", "🚫 Access Denied")
+_ACCESS_DENIED_TITLE = _md("🚫 **Access Denied**")
+_ACCESS_DENIED_CONTACT = _md("📞 **Contact your administrator with your Open ID to request access.**")
+_AUTHORIZATION_ERROR_CARD = _card(_CARD_CONFIG, _ACCESS_DENIED_HEADER, [
+    _ACCESS_DENIED_TITLE,
+    _md("You are not authorized to use this bot."),
+    _md("Please contact an administrator for access."),
+])
+
+_RATE_LIMIT_HEADER = _header("orange", "⏰ Rate Limit Exceeded")
+_RATE_LIMIT_TITLE = _md("⏰ **Rate Limit Exceeded**")
+_RATE_LIMIT_FOOTER = _md("Please wait before sending more commands.")
+
+def _rate_limit_card(max_commands: int, time_window: int) -> dict:
+    return _card(_CARD_CONFIG, _RATE_LIMIT_HEADER, [
+        _RATE_LIMIT_TITLE,
+        _md(f"Maximum {max_commands} commands per {time_window} seconds."),
+        _RATE_LIMIT_FOOTER,
+    ])
+
+async def _run_middleware(middleware: Callable, next_step: Callable, context: CommandContext) -> bool:
+    """One link of the compiled pipeline: run middleware, then the rest of the chain if allowed."""
+    try:
+        allowed = await middleware(context)
+    except Exception as e:
+        logger.error("❌ Middleware error: %s", e)
+        return False
+    if not allowed:
+        logger.info("🚫 Middleware blocked command: %s", context.command)
+        return False
+    return await next_step(context)
+
 class HandlerRegistry:
     def __init__(self, config_class):
         self.config = config_class
         self.handlers: Dict[str, BaseHandler] = {}
-        self.aliases: Dict[str, str] = {}
+        # Single routing table: command names and aliases -> handler
+        self._routes: Dict[str, BaseHandler] = {}
+        # Registered command names in registration order, returned by list_commands()
+        self._commands_tuple: Tuple[str, ...] = ()
         self.middleware: List[Callable] = []
+        # Middleware composed around _dispatch, rebuilt by add_middleware
+        self._pipeline: Callable = self._dispatch
+        # Sorted command names and full help text, rebuilt lazily after (un)register
+        self._sorted_names: Optional[Tuple[str, ...]] = None
+        self._help_text: Optional[str] = None
+        self._available_cmds_str: Optional[str] = None
 
     def register(self, handler: BaseHandler) -> None:
-        command_name = handler.name.lower()
+        command_name = sys.intern(handler.name.casefold())
         if command_name in self.handlers:
-            logger.warning(f"⚠️ Overwriting existing handler for command: {command_name}")
+            logger.warning("⚠️ Overwriting existing handler for command: %s", command_name)
         self.handlers[command_name] = handler
         for alias in handler.aliases:
-            alias_lower = alias.lower()
-            if alias_lower in self.aliases:
-                logger.warning(f"⚠️ Overwriting existing alias: {alias_lower}")
-            self.aliases[alias_lower] = command_name
-        logger.info(f"✅ Registered handler: {command_name}")
+            alias_key = alias.casefold()
+            existing = self._routes.get(alias_key)
+            if existing is not None and existing is not handler and alias_key not in self.handlers:
+                logger.warning("⚠️ Overwriting existing alias: %s", alias_key)
+        self._rebuild_routes()
+        logger.info("✅ Registered handler: %s", command_name)
 
     def unregister(self, command_name: str) -> bool:
-        command_name = command_name.lower()
+        command_name = command_name.casefold()
         if command_name not in self.handlers:
             return False
-        handler = self.handlers[command_name]
         del self.handlers[command_name]
-        for alias in handler.aliases:
-            alias_lower = alias.lower()
-            if alias_lower in self.aliases:
-                del self.aliases[alias_lower]
-        logger.info(f"✅ Unregistered handler: {command_name}")
+        self._rebuild_routes()
+        logger.info("✅ Unregistered handler: %s", command_name)
         return True
 
+    def _rebuild_routes(self) -> None:
+        # Later registrations win for aliases; command names always win over aliases
+        routes: Dict[str, BaseHandler] = {}
+        for handler in self.handlers.values():
+            for alias in handler.aliases:
+                routes[sys.intern(alias.casefold())] = handler
+        routes.update(self.handlers)
+        self._routes = routes
+        self._commands_tuple = tuple(self.handlers)
+        self._sorted_names = self._help_text = self._available_cmds_str = None
+
     def get_handler(self, command_name: str) -> Optional[BaseHandler]:
-        command_name = command_name.lower()
-        if command_name in self.handlers:
-            return self.handlers[command_name]
-        if command_name in self.aliases:
-            actual_command = self.aliases[command_name]
-            return self.handlers.get(actual_command)
-        return None
+        # context.command is already casefolded by the parser; only casefold() on a miss
+        handler = self._routes.get(command_name)
+        if handler is None:
+            handler = self._routes.get(command_name.casefold())
+        return handler
+
+    def get_handler_fast(self, command_name: str) -> Optional[BaseHandler]:
+        # For names that are already casefolded (CommandContext.command from the parser)
+        return self._routes.get(command_name)
+
+    def list_commands(self) -> Tuple[str, ...]:
+        return self._commands_tuple
+
+    def list_commands_sorted(self) -> Tuple[str, ...]:
+        if self._sorted_names is None:
+            self._sorted_names = tuple(sorted(self.handlers))
+        return self._sorted_names
 
-    def list_commands(self) -> List[str]:
-        return list(self.handlers.keys())
+    def _available_commands_text(self) -> str:
+        if self._available_cmds_str is None:
+            self._available_cmds_str = ", ".join([f"/{cmd}" for cmd in self.list_commands_sorted()])
+        return self._available_cmds_str
 
     def add_middleware(self, middleware_func: Callable) -> None:
         self.middleware.append(middleware_func)
-        logger.info(f"✅ Added middleware: {middleware_func.__name__}")
+        self._pipeline = self._build_pipeline()
+        logger.info("✅ Added middleware: %s", middleware_func.__name__)
+
+    def _build_pipeline(self) -> Callable:
+        # Compose middleware around the dispatcher once, first-added outermost
+        pipeline = self._dispatch
+        for middleware in reversed(self.middleware):
+            pipeline = functools.partial(_run_middleware, middleware, pipeline)
+        return pipeline
+
+    async def _dispatch(self, context: CommandContext) -> bool:
+        # context.command is casefolded by LarkMessageParser.parse_command
+        handler = self.get_handler_fast(context.command)
+        if not handler:
+            await self._send_unknown_command_message(context)
+            return False
+        logger.info("🎯 Executing command: %s (user: %s)", context.command, context.sender_id)
+        start_time = time.perf_counter()
+        success = await handler.handle(context)
+        execution_time = time.perf_counter() - start_time
+        if success:
+            logger.info("✅ Command completed: %s (%.2fs)", context.command, execution_time)
+        else:
+            logger.warning("⚠️ Command failed: %s", context.command)
+        return success
 
     async def execute_command(self, context: CommandContext) -> bool:
         try:
-            for middleware in self.middleware:
-                try:
-                    should_continue = await middleware(context)
-                    if not should_continue:
-                        logger.info(f"🚫 Middleware blocked command: {context.command}")
-                        return False
-                except Exception as e:
-                    logger.error(f"❌ Middleware error: {e}")
-                    return False
-            handler = self.get_handler(context.command)
-            if not handler:
-                await self._send_unknown_command_message(context)
-                return False
-            logger.info(f"🎯 Executing command: {context.command} (user: {context.sender_id})")
-            start_time = datetime.now()
-            success = await handler.handle(context)
-            execution_time = (datetime.now() - start_time).total_seconds()
-            if success:
-                logger.info(f"✅ Command completed: {context.command} ({execution_time:.2f}s)")
-            else:
-                logger.warning(f"⚠️ Command failed: {context.command}")
-            return success
+            return await self._pipeline(context)
         except Exception as e:
-            logger.error(f"❌ Error executing command {context.command}: {e}")
+            logger.error("❌ Error executing command %s: %s", context.command, e)
             await self._send_error_message(context, str(e))
             return False
 
-    def _create_unknown_command_card(self, command: str, available_commands: List[str]) -> dict:
+    def _create_unknown_command_card(self, command: str, commands_list: str) -> dict:
         """Create rich card for unknown command error."""
-        commands_list = ", ".join([f"/{cmd}" for cmd in sorted(available_commands)])
-        
-        return {
-            "config": {
-                "wide_screen_mode": True,
-                "enable_forward": True
-            },
-            "header": {
-                "template": "orange",
-                "title": {
-                    "tag": "plain_text",
-                    "content": "❓ Unknown Command"
-                }
-            },
-            "elements": [
-                {
-                    "tag": "div",
-                    "text": {
-                        "tag": "lark_md",
-                        "content": f"❓ **Unknown command: /{command}**"
-                    }
-                },
-                {
-                    "tag": "hr"
-                },
-                {
-                    "tag": "div",
-                    "text": {
-                        "tag": "lark_md",
-                        "content": f"**Available commands:** {commands_list}"
-                    }
-                },
-                {
-                    "tag": "div",
-                    "text": {
-                        "tag": "lark_md",
-                        "content": "Use **/help** for detailed information."
-                    }
-                }
-            ]
-        }
+        return _card(_CARD_CONFIG_FORWARD, _UNKNOWN_HEADER, [
+            _md(f"❓ **Unknown command: /{command}**"),
+            _HR,
+            _md(f"**Available commands:** {commands_list}"),
+            _UNKNOWN_FOOTER,
+        ])
 
     def _create_error_card(self, command: str, error: str) -> dict:
         """Create rich card for command execution errors."""
-        return {
-            "config": {
-                "wide_screen_mode": True,
-                "enable_forward": False
-            },
-            "header": {
-                "template": "red",
-                "title": {
-                    "tag": "plain_text",
-                    "content": "💥 Command Error"
-                }
-            },
-            "elements": [
-                {
-                    "tag": "div",
-                    "text": {
-                        "tag": "lark_md",
-                        "content": "💥 **Command Error**"
-                    }
-                },
-                {
-                    "tag": "div",
-                    "text": {
-                        "tag": "lark_md",
-                        "content": f"**Command:** /{command}\n**Error:** {error}"
-                    }
-                },
-                {
-                    "tag": "div",
-                    "text": {
-                        "tag": "lark_md",
-                        "content": "Please try again or contact support if the issue persists."
-                    }
-                }
-            ]
-        }
+        return _card(_CARD_CONFIG, _ERROR_HEADER, [
+            _ERROR_TITLE,
+            _md(f"**Command:** /{command}\n**Error:** {error}"),
+            _ERROR_FOOTER,
+        ])
 
     def _create_authorization_error_card(self) -> dict:
         """Create rich card for authorization errors."""
-        return {
-            "config": {
-                "wide_screen_mode": True,
-                "enable_forward": False
-            },
-            "header": {
-                "template": "red",
-                "title": {
-                    "tag": "plain_text",
-                    "content": "🚫 Access Denied"
-                }
-            },
-            "elements": [
-                {
-                    "tag": "div",
-                    "text": {
-                        "tag": "lark_md",
-                        "content": "🚫 **Access Denied**"
-                    }
-                },
-                {
-                    "tag": "div",
-                    "text": {
-                        "tag": "lark_md",
-                        "content": "You are not authorized to use this bot."
-                    }
-                },
-                {
-                    "tag": "div",
-                    "text": {
-                        "tag": "lark_md",
-                        "content": "Please contact an administrator for access."
-                    }
-                }
-            ]
-        }
+        return _AUTHORIZATION_ERROR_CARD
 
     def _create_rate_limit_card(self, max_commands: int, time_window: int) -> dict:
         """Create rich card for rate limit errors."""
-        return {
-            "config": {
-                "wide_screen_mode": True,
-                "enable_forward": False
-            },
-            "header": {
-                "template": "orange",
-                "title": {
-                    "tag": "plain_text",
-                    "content": "⏰ Rate Limit Exceeded"
-                }
-            },
-            "elements": [
-                {
-                    "tag": "div",
-                    "text": {
-                        "tag": "lark_md",
-                        "content": "⏰ **Rate Limit Exceeded**"
-                    }
-                },
-                {
-                    "tag": "div",
-                    "text": {
-                        "tag": "lark_md",
-                        "content": f"Maximum {max_commands} commands per {time_window} seconds."
-                    }
-                },
-                {
-                    "tag": "div",
-                    "text": {
-                        "tag": "lark_md",
-                        "content": "Please wait before sending more commands."
-                    }
-                }
-            ]
-        }
+        return _rate_limit_card(max_commands, time_window)
 
-    async def _send_unknown_command_message(self, context: CommandContext) -> None:
-        """FIXED: Send unknown command message as rich card instead of plain text."""
+    async def _safe_send(self, context: CommandContext, card: dict, fallback: str, what: str) -> None:
+        """Send card; if that fails, fall back to plain text. Never raises."""
+        topic_manager = context.topic_manager
         try:
-            available_commands = self.list_commands()
-            unknown_card = self._create_unknown_command_card(context.command, available_commands)
-            await context.topic_manager.send_command_response(unknown_card, msg_type="interactive")
+            if await topic_manager.send_command_response(card, msg_type="interactive"):
+                return
+            logger.error("❌ Error sending %s card: send failed", what)
         except Exception as e:
-            logger.error(f"❌ Error sending unknown command message: {e}")
-            # Fallback to plain text if card fails
-            try:
-                available_commands = ", ".join([f"/{cmd}" for cmd in sorted(self.list_commands())])
-                error_msg = (
-                    f"❓ **Unknown command: /{context.command}**\n\n"
-                    f"Available commands: {available_commands}\n\n"
-                    f"Use `/help` for detailed information."
-                )
-                await context.topic_manager.send_command_response(error_msg)
-            except Exception as fallback_error:
-                logger.error(f"❌ Error sending fallback message: {fallback_error}")
+            logger.error("❌ Error sending %s card: %s", what, e)
+        # Fallback to plain text if card fails
+        try:
+            await topic_manager.send_command_response(fallback)
+        except Exception as fallback_error:
+            logger.error("❌ Error sending fallback %s message: %s", what, fallback_error)
+
+    async def _send_unknown_command_message(self, context: CommandContext) -> None:
+        """FIXED: Send unknown command message as rich card instead of plain text."""
+        commands_list = self._available_commands_text()
+        await self._safe_send(
+            context,
+            self._create_unknown_command_card(context.command, commands_list),
+            f"❓ **Unknown command: /{context.command}**\n\n"
+            f"Available commands: {commands_list}\n\n"
+            f"Use `/help` for detailed information.",
+            "unknown command",
+        )
 
     async def _send_error_message(self, context: CommandContext, error: str) -> None:
         """FIXED: Send error message as rich card instead of plain text."""
-        try:
-            error_card = self._create_error_card(context.command, error)
-            await context.topic_manager.send_command_response(error_card, msg_type="interactive")
-        except Exception as e:
-            logger.error(f"❌ Error sending error card: {e}")
-            # Fallback to plain text if card fails
-            try:
-                error_msg = f"💥 **Command Error**\nCommand: /{context.command}\nError: {error}"
-                await context.topic_manager.send_command_response(error_msg)
-            except Exception as fallback_error:
-                logger.error(f"❌ Error sending fallback error message: {fallback_error}")
+        await self._safe_send(
+            context,
+            self._create_error_card(context.command, error),
+            f"💥 **Command Error**\nCommand: /{context.command}\nError: {error}",
+            "error",
+        )
 
     def get_help_text(self, command_name: Optional[str] = None) -> str:
         if command_name:
@@ -334,70 +339,40 @@ class HandlerRegistry:
                 return handler.get_help_text()
             else:
                 return f"❓ Unknown command: /{command_name}"
-        help_sections = ["🤖 **Available Commands:**\n"]
-        for command_name in sorted(self.list_commands()):
-            handler = self.handlers[command_name]
-            help_sections.append(handler.get_help_text())
-            help_sections.append("")
-        return "\n".join(help_sections)
+        if self._help_text is None:
+            help_sections = ["🤖 **Available Commands:**\n"]
+            for command_name in self.list_commands_sorted():
+                handler = self.handlers[command_name]
+                help_sections.append(handler.get_help_text())
+                help_sections.append("")
+            self._help_text = "\n".join(help_sections)
+        return self._help_text
 
 # FIXED: Authorization middleware now uses rich cards
 async def authorization_middleware(context: CommandContext) -> bool:
-    # NEW: Use LARK_AUTHORIZED_USERS instead of ALLOWED_USERS
-    allowed_ids = os.getenv("LARK_AUTHORIZED_USERS", "")
-    allowed_set = set(uid.strip() for uid in allowed_ids.split(",") if uid.strip())
+    # NEW: Use LARK_AUTHORIZED_USERS instead of ALLOWED_USERS (re-parsed only when .env changes)
+    _refresh_allowed_users()
     
     # NEW: If no users configured, allow all (development mode)
-    if not allowed_set:
-        logger.info(f"🔓 No authorization configured - allowing user {context.sender_id}")
+    if not Config.LARK_AUTHORIZED_USERS:
+        logger.info("🔓 No authorization configured - allowing user %s", context.sender_id)
         return True
     
-    if context.sender_id not in allowed_set:
-        logger.warning(f"🚫 Unauthorized command attempt: {context.command} by {context.sender_id}")
+    if not Config.is_user_authorized(context.sender_id):
+        logger.warning("🚫 Unauthorized command attempt: %s by %s", context.command, context.sender_id)
         try:
             # Create authorization error card with Open ID shown
-            auth_error_card = {
-                "config": {
-                    "wide_screen_mode": True,
-                    "enable_forward": False
-                },
-                "header": {
-                    "template": "red",
-                    "title": {
-                        "tag": "plain_text",
-                        "content": "🚫 Access Denied"
-                    }
-                },
-                "elements": [
-                    {
-                        "tag": "div",
-                        "text": {
-                            "tag": "lark_md",
-                            "content": "🚫 **Access Denied**"
-                        }
-                    },
-                    {
-                        "tag": "div",
-                        "text": {
-                            "tag": "lark_md",
-                            "content": f"🆔 **Your Open ID:** `{context.sender_id}`"
-                        }
-                    },
-                    {
-                        "tag": "div",
-                        "text": {
-                            "tag": "lark_md",
-                            "content": "📞 **Contact your administrator with your Open ID to request access.**"
-                        }
-                    }
-                ]
-            }
+            auth_error_card = _card(_CARD_CONFIG, _ACCESS_DENIED_HEADER, [
+                _ACCESS_DENIED_TITLE,
+                _md(f"🆔 **Your Open ID:** `{context.sender_id}`"),
+                _ACCESS_DENIED_CONTACT,
+            ])
             await context.topic_manager.send_command_response(auth_error_card, msg_type="interactive")
         except Exception as e:
-            logger.error(f"❌ Error sending authorization error: {e}")
+            logger.error("❌ Error sending authorization error: %s", e)
         return False
     
-    logger.info(f"✅ User {context.sender_id} authorized for /{context.command}")
+    logger.info("✅ User %s authorized for /%s", context.sender_id, context.command)
     return True
 
 # Optional: Rate limiter middleware with rich cards
@@ -405,61 +380,27 @@ class RateLimiter:
     def __init__(self, max_commands: int = 10, time_window: int = 60):
         self.max_commands = max_commands
         self.time_window = time_window
-        self.user_commands: Dict[str, List[datetime]] = {}
+        # Monotonic timestamps of each user's recent commands, oldest first
+        self._rate_limit_card = _rate_limit_card(max_commands, time_window)
+        self.user_commands: Dict[str, Deque[float]] = defaultdict(
+            functools.partial(deque, maxlen=max_commands)
+        )
 
     async def rate_limit_middleware(self, context: CommandContext) -> bool:
         user_id = context.sender_id
-        now = datetime.now()
-        if user_id not in self.user_commands:
-            self.user_commands[user_id] = []
-        cutoff_time = now.timestamp() - self.time_window
-        self.user_commands[user_id] = [
-            cmd_time for cmd_time in self.user_commands[user_id]
-            if cmd_time.timestamp() > cutoff_time
-        ]
-        if len(self.user_commands[user_id]) >= self.max_commands:
-            logger.warning(f"🚫 Rate limit exceeded: {context.command} by {user_id}")
+        now = time.monotonic()
+        recent = self.user_commands[user_id]
+        cutoff_time = now - self.time_window
+        while recent and recent[0] <= cutoff_time:
+            recent.popleft()
+        if len(recent) >= self.max_commands:
+            logger.warning("🚫 Rate limit exceeded: %s by %s", context.command, user_id)
             try:
-                # FIXED: Rate limit error as rich card
-                rate_limit_card = {
-                    "config": {
-                        "wide_screen_mode": True,
-                        "enable_forward": False
-                    },
-                    "header": {
-                        "template": "orange",
-                        "title": {
-                            "tag": "plain_text",
-                            "content": "⏰ Rate Limit Exceeded"
-                        }
-                    },
-                    "elements": [
-                        {
-                            "tag": "div",
-                            "text": {
-                                "tag": "lark_md",
-                                "content": "⏰ **Rate Limit Exceeded**"
-                            }
-                        },
-                        {
-                            "tag": "div",
-                            "text": {
-                                "tag": "lark_md",
-                                "content": f"Maximum {self.max_commands} commands per {self.time_window} seconds."
-                            }
-                        },
-                        {
-                            "tag": "div",
-                            "text": {
-                                "tag": "lark_md",
-                                "content": "Please wait before sending more commands."
-                            }
-                        }
-                    ]
-                }
+                # FIXED: Rate limit error as rich card (fixed per limiter, built once)
+                rate_limit_card = self._rate_limit_card
                 await context.topic_manager.send_command_response(rate_limit_card, msg_type="interactive")
             except Exception as e:
-                logger.error(f"❌ Error sending rate limit error: {e}")
+                logger.error("❌ Error sending rate limit error: %s", e)
             return False
-        self.user_commands[user_id].append(now)
+        recent.append(now)
         return True
\ No newline at end of file
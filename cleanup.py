@@ -8,11 +8,10 @@ Simple and clean - keeps only recent logs to prevent disk space issues
 """
 
 import os
-import glob
+import fnmatch
 import time
 import logging
 import schedule
-import threading
 from datetime import datetime, timedelta
 from dotenv import load_dotenv
 
@@ -23,6 +22,9 @@ load_dotenv()
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+# Log files to clean (including rotated ones like .log.1, .log.2, etc.)
+LOG_PATTERNS = ("*.log", "*.log.*", "*.out", "*.err")
+
 class LogCleanupScheduler:
     """Scheduler for daily log cleanup."""
     
@@ -40,26 +42,24 @@ class LogCleanupScheduler:
             cutoff_date = datetime.now() - timedelta(days=self.days_to_keep)
             cutoff_timestamp = cutoff_date.timestamp()
             
-            # Find all log files (including rotated ones like .log.1, .log.2, etc.)
-            log_patterns = [
-                f"{self.log_dir}/*.log",
-                f"{self.log_dir}/*.log.*",
-                f"{self.log_dir}/*.out",
-                f"{self.log_dir}/*.err"
-            ]
-            
             cleaned_files = []
             total_size_cleaned = 0
             
-            for pattern in log_patterns:
-                for log_file in glob.glob(pattern):
+            # Single directory pass; one stat per matching file gives both mtime and size
+            with os.scandir(self.log_dir) as entries:
+                for entry in entries:
+                    name = entry.name
+                    if name.startswith(".") or not any(fnmatch.fnmatchcase(name, p) for p in LOG_PATTERNS):
+                        continue
+                    log_file = entry.path
                     try:
-                        file_mtime = os.path.getmtime(log_file)
-                        if file_mtime < cutoff_timestamp:
-                            file_size = os.path.getsize(log_file)
+                        if not entry.is_file():
+                            continue
+                        st = entry.stat()
+                        if st.st_mtime < cutoff_timestamp:
                             os.remove(log_file)
                             cleaned_files.append(log_file)
-                            total_size_cleaned += file_size
+                            total_size_cleaned += st.st_size
                             logger.info(f"Cleaned up old log: {log_file}")
                     except OSError as e:
                         logger.warning(f"Could not remove {log_file}: {e}")
@@ -74,23 +74,17 @@ class LogCleanupScheduler:
             logger.error(f"❌ Error during log cleanup: {e}")
     
     def run_scheduled_cleanup(self):
-        """Wrapper to run cleanup in separate thread."""
-        def thread_target():
-            try:
-                logger.info("📞 SCHEDULED LOG CLEANUP TRIGGERED!")
-                logger.info(f"🕐 Cleanup time: {datetime.now()}")
-                logger.info(f"🗂️  Cleaning logs older than {self.days_to_keep} days from {self.log_dir}/")
+        """Run the scheduled cleanup, logging (not raising) any failure."""
+        try:
+            logger.info("📞 SCHEDULED LOG CLEANUP TRIGGERED!")
+            logger.info(f"🕐 Cleanup time: {datetime.now()}")
+            logger.info(f"🗂️  Cleaning logs older than {self.days_to_keep} days from {self.log_dir}/")
+            
+            self.cleanup_old_logs()
+            logger.info("✅ Scheduled log cleanup completed")
                 
-                self.cleanup_old_logs()
-                logger.info("✅ Scheduled log cleanup completed")
-                    
-            except Exception as e:
-                logger.error(f"❌ Error in scheduled cleanup thread: {e}")
-        
-        # Run in separate thread to avoid blocking
-        thread = threading.Thread(target=thread_target)
-        thread.start()
-        thread.join()  # Wait for completion
+        except Exception as e:
+            logger.error(f"❌ Error in scheduled cleanup: {e}")
 
 def main():
     """Main function to run the daily log cleanup scheduler."""
@@ -126,11 +120,13 @@ def main():
         
         # Run scheduler
         loop_count = 0
+        last_alive_log = time.monotonic()
         while True:
             loop_count += 1
             
-            # Log every 60 loops (60 minutes) to show it's alive
-            if loop_count % 60 == 0:
+            # Log about once an hour to show it's alive
+            if time.monotonic() - last_alive_log >= 3600:
+                last_alive_log = time.monotonic()
                 current_time = datetime.now()
                 logger.info(f"🔄 Log cleanup scheduler alive - Loop #{loop_count}, Time: {current_time}")
                 
@@ -141,7 +137,10 @@ def main():
                     logger.info(f"⏰ Next scheduled cleanup: {next_run}")
             
             schedule.run_pending()
-            time.sleep(60)  # Check every minute
+            
+            # Sleep until the next job is due (at most an hour, so the alive log keeps ticking)
+            idle = schedule.idle_seconds()
+            time.sleep(max(1.0, min(idle if idle is not None else 60, 3600)))
             
     except KeyboardInterrupt:
         logger.info("Log cleanup scheduler stopped by user")
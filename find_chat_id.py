@@ -4,14 +4,30 @@ Simple script to find your Chat ID
 """
 
 import os
-import requests
+import asyncio
+import aiohttp
 import json
 from dotenv import load_dotenv
 
+# orjson is optional: faster response decoding, stdlib json otherwise
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
 # Load environment variables
 load_dotenv()
 
-def get_access_token():
+# Connect/read timeouts so a stalled API call can't hang the script
+TIMEOUT = aiohttp.ClientTimeout(connect=3, sock_read=10)
+
+async def _json(response):
+    """Decode a response body with orjson when available."""
+    if orjson is not None:
+        return orjson.loads(await response.read())
+    return await response.json(content_type=None)
+
+async def get_access_token(session):
     """Get access token"""
     app_id = os.getenv('LARK_APP_ID')
     app_secret = os.getenv('LARK_APP_SECRET')
@@ -19,8 +35,8 @@ def get_access_token():
     url = "https://open.larksuite.com/open-apis/auth/v3/tenant_access_token/internal"
     data = {"app_id": app_id, "app_secret": app_secret}
     
-    response = requests.post(url, json=data)
-    result = response.json()
+    async with session.post(url, json=data) as response:
+        result = await _json(response)
     
     if result.get('code') == 0:
         return result.get('tenant_access_token')
@@ -28,56 +44,74 @@ def get_access_token():
         print(f"❌ Token error: {result.get('msg')}")
         return None
 
-def list_chats():
-    """List all chats the bot is in"""
-    token = get_access_token()
-    if not token:
-        return
-    
+async def fetch_chats(session, token):
+    """Fetch every chat the bot is in, following page_token until the last page"""
     url = "https://open.larksuite.com/open-apis/im/v1/chats"
     headers = {'Authorization': f'Bearer {token}'}
     params = {'page_size': 100}
+    chats = []
+    
+    while True:
+        async with session.get(url, headers=headers, params=params) as response:
+            result = await _json(response)
+        
+        if result.get('code') != 0:
+            raise RuntimeError(f"API error: {result.get('msg')}")
+        
+        data = result.get('data', {})
+        chats.extend(data.get('items', []))
+        
+        # Each page only reveals the next page's token, so pages are fetched in order
+        if not data.get('has_more') or not data.get('page_token'):
+            return chats
+        params['page_token'] = data['page_token']
+
+async def list_chats(session):
+    """List all chats the bot is in"""
+    token = await get_access_token(session)
+    if not token:
+        return
     
     try:
-        response = requests.get(url, headers=headers, params=params)
-        result = response.json()
+        chats = await fetch_chats(session, token)
         
-        if result.get('code') == 0:
-            chats = result.get('data', {}).get('items', [])
+        print("🔍 FINDING YOUR CHAT ID")
+        print("=" * 70)
+        print(f"Found {len(chats)} chats that your bot is in:")
+        print()
+        
+        for i, chat in enumerate(chats, 1):
+            chat_id = chat.get('chat_id', '')
+            name = chat.get('name', 'Unnamed Chat')
+            chat_type = chat.get('chat_type', '')
+            member_count = chat.get('member_count', 0)
             
-            print("🔍 FINDING YOUR CHAT ID")
-            print("=" * 70)
-            print(f"Found {len(chats)} chats that your bot is in:")
+            print(f"{i}. Chat: {name}")
+            print(f"   Chat ID: {chat_id}")
+            print(f"   Type: {chat_type}")
+            print(f"   Members: {member_count}")
             print()
-            
-            for i, chat in enumerate(chats, 1):
-                chat_id = chat.get('chat_id', '')
-                name = chat.get('name', 'Unnamed Chat')
-                chat_type = chat.get('chat_type', '')
-                member_count = chat.get('member_count', 0)
-                
-                print(f"{i}. Chat: {name}")
-                print(f"   Chat ID: {chat_id}")
-                print(f"   Type: {chat_type}")
-                print(f"   Members: {member_count}")
-                print()
-            
-            print("=" * 70)
-            print("📋 Copy the Chat ID of your production group to .env:")
-            print("LARK_CHAT_ID=oc_your_chat_id_here")
-            
-        else:
-            print(f"❌ API error: {result.get('msg')}")
-            
+        
+        print("=" * 70)
+        print("📋 Copy the Chat ID of your production group to .env:")
+        print("LARK_CHAT_ID=oc_your_chat_id_here")
+    
+    except RuntimeError as e:
+        print(f"❌ {e}")
     except Exception as e:
         print(f"❌ Error: {e}")
 
+async def run():
+    # One session so the chat listing reuses the token request's connection
+    async with aiohttp.ClientSession(timeout=TIMEOUT) as session:
+        await list_chats(session)
+
 def main():
     if not os.getenv('LARK_APP_ID') or not os.getenv('LARK_APP_SECRET'):
         print("❌ Error: Make sure LARK_APP_ID and LARK_APP_SECRET are set in .env")
         return
     
-    list_chats()
+    asyncio.run(run())
 
 if __name__ == '__main__':
-    main()
\ No newline at end of file
+    main()
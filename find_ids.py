@@ -4,82 +4,80 @@ Lark Topic ID Extractor - Extract specific IDs for PROD environment
 Based on your existing bot code
 """
 
+import asyncio
+import io
 import json
-import logging
 import os
-import time
+import re
+import sys
 from dotenv import load_dotenv
-import requests
+
+from lark_script_client import LarkScriptClient
+
+# orjson is optional: faster message-body decoding, stdlib json otherwise
+try:
+    import orjson
+except ImportError:
+    orjson = None
 
 # Load environment variables
 load_dotenv()
 
-class LarkTopicExtractor:
+# Topic keywords in priority order: each alternative is a lookahead over the
+# whole text, so QUICKGUIDE beats COMMANDS beats DAILYREPORT like the old elif chain
+TOPIC_PATTERN = re.compile(
+    r"(?=.*?(?P<QUICKGUIDE>quick ?guide))"
+    r"|(?=.*?(?P<COMMANDS>commands))"
+    r"|(?=.*?(?P<DAILYREPORT>daily[- ]?report))",
+    re.IGNORECASE | re.DOTALL,
+)
+
+class LarkTopicExtractor(LarkScriptClient):
     def __init__(self):
-        self.app_id = os.getenv('LARK_APP_ID')
-        self.app_secret = os.getenv('LARK_APP_SECRET')
-        self.chat_id = os.getenv('LARK_CHAT_ID')
-        self.base_url = "https://open.larksuite.com/open-apis"
-        self.tenant_access_token = None
-        self.token_expires = 0
-        
-        # Setup basic logging
-        logging.basicConfig(level=logging.INFO)
-        self.logger = logging.getLogger(__name__)
-    
-    def get_tenant_access_token(self):
-        """Get access token"""
-        if self.tenant_access_token and time.time() < self.token_expires:
-            return self.tenant_access_token
-            
-        url = f"{self.base_url}/auth/v3/tenant_access_token/internal"
-        data = {"app_id": self.app_id, "app_secret": self.app_secret}
+        super().__init__()
         
-        try:
-            response = requests.post(url, json=data)
-            result = response.json()
-            
-            if result.get('code') == 0:
-                self.tenant_access_token = result.get('tenant_access_token')
-                self.token_expires = time.time() + 5400
-                return self.tenant_access_token
-            else:
-                self.logger.error(f"Token error: {result.get('msg')}")
-                return None
-        except Exception as e:
-            self.logger.error(f"Token exception: {e}")
-            return None
+        # Decoder bound once and reused for every message body
+        self._json_decode = orjson.loads if orjson is not None else json.JSONDecoder().decode
     
-    def get_chat_messages(self):
-        """Get messages from chat"""
-        token = self.get_tenant_access_token()
+    async def iter_chat_message_pages(self):
+        """Yield pages of messages from chat, following page_token across pages"""
+        token = await self.get_tenant_access_token()
         if not token:
-            return []
+            return
         
         url = f"{self.base_url}/im/v1/messages"
-        headers = {'Authorization': f'Bearer {token}'}
         params = {
             'container_id_type': 'chat',
             'container_id': self.chat_id,
             'page_size': 50  # Get more messages to find topics
         }
         
-        try:
-            response = requests.get(url, headers=headers, params=params)
-            result = response.json()
+        while True:
+            try:
+                result = await self._api_get(url, params)
+            except Exception as e:
+                self.logger.error(f"Get messages error: {e}")
+                return
             
-            if result.get('code') == 0:
-                return result.get('data', {}).get('items', [])
-            else:
+            if result.get('code') != 0:
                 self.logger.error(f"Get messages failed: {result.get('msg')}")
-                return []
-        except Exception as e:
-            self.logger.error(f"Get messages error: {e}")
-            return []
+                return
+            
+            data = result.get('data', {})
+            yield data.get('items', [])
+            
+            if not data.get('has_more') or not data.get('page_token'):
+                return
+            params['page_token'] = data['page_token']
     
     def extract_text_from_message(self, msg_data):
         """Extract text content from message"""
         try:
+            # Only text and post messages carry topic text; skip decoding anything else
+            msg_type = msg_data.get('msg_type', '')
+            if msg_type not in ('text', 'post'):
+                return ''
+            
             # Get content from body.content (as shown in your logs)
             body = msg_data.get('body', {})
             content_str = body.get('content', '{}')
@@ -87,9 +85,7 @@ class LarkTopicExtractor:
             if not content_str or content_str == '{}':
                 return ''
             
-            content = json.loads(content_str)
-            
-            msg_type = msg_data.get('msg_type', '')
+            content = self._json_decode(content_str)
             
             if msg_type == 'text':
                 return content.get('text', '')
@@ -115,18 +111,13 @@ class LarkTopicExtractor:
             self.logger.debug(f"Error extracting text: {e}")
             return ''
     
-    def find_topic_ids(self):
+    async def find_topic_ids(self):
         """Find and extract topic IDs"""
         print("🔍 Extracting Lark Topic IDs for PROD environment...")
         print(f"📋 Chat ID: {self.chat_id}")
         print("=" * 70)
         
-        messages = self.get_chat_messages()
-        if not messages:
-            print("❌ No messages found!")
-            return
-        
-        print(f"📨 Analyzing {len(messages)} messages...")
+        print("📨 Analyzing messages...")
         print("=" * 70)
         
         # Track found topics
@@ -136,59 +127,62 @@ class LarkTopicExtractor:
             'DAILYREPORT': None
         }
         
-        for i, msg_data in enumerate(messages):
-            msg_id = msg_data.get('message_id', '')
-            thread_id = msg_data.get('thread_id', '')
-            parent_id = msg_data.get('parent_id', '')
-            root_id = msg_data.get('root_id', '')
-            msg_type = msg_data.get('msg_type', '')
-            sender_type = msg_data.get('sender', {}).get('sender_type', '')
-            
-            # Extract text content
-            text_content = self.extract_text_from_message(msg_data)
-            
-            if not text_content:
-                continue
+        # Pages are streamed, so only one page of messages is held at a time
+        # Each page's output is buffered and written once that page is done
+        buf = io.StringIO()
+        count = 0
+        remaining = len(found_topics)
+        async for page in self.iter_chat_message_pages():
+            for msg_data in page:
+                count += 1
+                msg_id = msg_data.get('message_id', '')
+                thread_id = msg_data.get('thread_id', '')
+                parent_id = msg_data.get('parent_id', '')
+                root_id = msg_data.get('root_id', '')
+                msg_type = msg_data.get('msg_type', '')
+                sender_type = msg_data.get('sender', {}).get('sender_type', '')
                 
-            text_lower = text_content.lower().strip()
-            
-            print(f"Message {i+1}: '{text_content}'")
-            print(f"  ID: {msg_id}")
-            print(f"  Thread ID: {thread_id}")
-            print(f"  Parent ID: {parent_id}")
-            print(f"  Type: {msg_type}")
-            print()
-            
-            # Look for topic keywords
-            if any(keyword in text_lower for keyword in ['#quickguide', '# quickguide', 'quickguide', 'quick guide']):
-                if not found_topics['QUICKGUIDE']:
-                    found_topics['QUICKGUIDE'] = {
-                        'thread_id': thread_id,
-                        'message_id': parent_id or root_id or msg_id,
-                        'content': text_content,
-                        'original_msg_id': msg_id
-                    }
-                    print(f"✅ Found QUICKGUIDE topic!")
-            
-            elif any(keyword in text_lower for keyword in ['#commands', '# commands', 'commands']):
-                if not found_topics['COMMANDS']:
-                    found_topics['COMMANDS'] = {
-                        'thread_id': thread_id,
-                        'message_id': parent_id or root_id or msg_id,
-                        'content': text_content,
-                        'original_msg_id': msg_id
-                    }
-                    print(f"✅ Found COMMANDS topic!")
+                # Extract text content
+                text_content = self.extract_text_from_message(msg_data)
+                
+                if not text_content:
+                    continue
+                
+                print(f"Message {count}: '{text_content}'", file=buf)
+                print(f"  ID: {msg_id}", file=buf)
+                print(f"  Thread ID: {thread_id}", file=buf)
+                print(f"  Parent ID: {parent_id}", file=buf)
+                print(f"  Type: {msg_type}", file=buf)
+                print(file=buf)
+                
+                # Look for topic keywords
+                match = TOPIC_PATTERN.match(text_content)
+                if match:
+                    topic_name = match.lastgroup
+                    if not found_topics[topic_name]:
+                        found_topics[topic_name] = {
+                            'thread_id': thread_id,
+                            'message_id': parent_id or root_id or msg_id,
+                            'content': text_content,
+                            'original_msg_id': msg_id
+                        }
+                        print(f"✅ Found {topic_name} topic!", file=buf)
+                        
+                        # Stop reading (and fetching pages) once every topic is found
+                        remaining -= 1
+                        if not remaining:
+                            break
             
-            elif any(keyword in text_lower for keyword in ['#dailyreport', '# dailyreport', '#daily-report', '# daily-report', 'daily report', 'dailyreport']):
-                if not found_topics['DAILYREPORT']:
-                    found_topics['DAILYREPORT'] = {
-                        'thread_id': thread_id,
-                        'message_id': parent_id or root_id or msg_id,
-                        'content': text_content,
-                        'original_msg_id': msg_id
-                    }
-                    print(f"✅ Found DAILYREPORT topic!")
+            sys.stdout.write(buf.getvalue())
+            sys.stdout.flush()
+            buf.seek(0)
+            buf.truncate()
+            if not remaining:
+                break
+        
+        if not count:
+            print("❌ No messages found!")
+            return
         
         print("=" * 70)
         print("🎯 EXTRACTION RESULTS")
@@ -233,6 +227,10 @@ class LarkTopicExtractor:
             for env_var in env_vars:
                 print(env_var)
 
+async def run():
+    async with LarkTopicExtractor() as extractor:
+        await extractor.find_topic_ids()
+
 def main():
     """Main function"""
     try:
@@ -244,8 +242,7 @@ def main():
             print("   - LARK_CHAT_ID")
             return
         
-        extractor = LarkTopicExtractor()
-        extractor.find_topic_ids()
+        asyncio.run(run())
         
     except Exception as e:
         print(f"❌ Error: {e}")
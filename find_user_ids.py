@@ -4,92 +4,91 @@ Enhanced User ID Extractor for Open ID Authorization
 This version focuses on extracting Open IDs (ou_xxx) for pre-authorization
 """
 
-import json
-import logging
+import asyncio
+import io
 import os
-import time
+import sys
 from collections import defaultdict
 from dotenv import load_dotenv
-import requests
+
+from lark_script_client import LarkScriptClient
 
 # Load environment variables
 load_dotenv()
 
-class LarkOpenIDExtractor:
+# Maximum Open IDs per contact/v3/users/batch request
+USER_BATCH_SIZE = 50
+# Requests per second allowed towards the Lark API (per-app QPS ceiling)
+QPS_LIMIT = float(os.getenv('LARK_QPS_LIMIT', '50'))
+
+class QPSLimiter:
+    """Spaces requests evenly so concurrent fan-outs stay under max_rate per second"""
+    
+    def __init__(self, max_rate):
+        # A rate of zero or below disables throttling
+        self.interval = 1.0 / max_rate if max_rate > 0 else 0.0
+        self.next_slot = 0.0
+    
+    async def acquire(self):
+        """Wait for the next free request slot"""
+        # Claim the slot before sleeping, so concurrent callers queue up behind it
+        now = asyncio.get_running_loop().time()
+        wait = self.next_slot - now
+        self.next_slot = max(now, self.next_slot) + self.interval
+        if wait > 0:
+            await asyncio.sleep(wait)
+
+class LarkOpenIDExtractor(LarkScriptClient):
     def __init__(self):
-        self.app_id = os.getenv('LARK_APP_ID')
-        self.app_secret = os.getenv('LARK_APP_SECRET')
-        self.chat_id = os.getenv('LARK_CHAT_ID')
-        self.base_url = "https://open.larksuite.com/open-apis"
-        self.tenant_access_token = None
-        self.token_expires = 0
-        
-        # Setup basic logging
-        logging.basicConfig(level=logging.INFO)
-        self.logger = logging.getLogger(__name__)
+        super().__init__()
+        self._rate_limiter = QPSLimiter(QPS_LIMIT)
     
-    def get_tenant_access_token(self):
-        """Get access token"""
-        if self.tenant_access_token and time.time() < self.token_expires:
-            return self.tenant_access_token
-            
-        url = f"{self.base_url}/auth/v3/tenant_access_token/internal"
-        data = {"app_id": self.app_id, "app_secret": self.app_secret}
-        
-        try:
-            response = requests.post(url, json=data)
-            result = response.json()
-            
-            if result.get('code') == 0:
-                self.tenant_access_token = result.get('tenant_access_token')
-                self.token_expires = time.time() + 5400
-                return self.tenant_access_token
-            else:
-                self.logger.error(f"Token error: {result.get('msg')}")
-                return None
-        except Exception as e:
-            self.logger.error(f"Token exception: {e}")
-            return None
+    async def _throttle(self):
+        # Throttle up front rather than burst into 429s and back off
+        await self._rate_limiter.acquire()
     
-    def get_chat_members(self):
-        """Get chat members directly (more reliable for Open IDs)"""
-        token = self.get_tenant_access_token()
+    async def iter_chat_members(self):
+        """Yield chat members directly (more reliable for Open IDs), following page_token across pages"""
+        token = await self.get_tenant_access_token()
         if not token:
-            return []
+            return
         
         url = f"{self.base_url}/im/v1/chats/{self.chat_id}/members"
-        headers = {'Authorization': f'Bearer {token}'}
         params = {
             'member_id_type': 'open_id',  # Request Open IDs specifically
             'page_size': 100
         }
         
-        try:
-            response = requests.get(url, headers=headers, params=params)
-            result = response.json()
+        while True:
+            try:
+                result = await self._api_get(url, params)
+            except Exception as e:
+                self.logger.error(f"Get chat members error: {e}")
+                return
             
-            if result.get('code') == 0:
-                return result.get('data', {}).get('items', [])
-            else:
+            if result.get('code') != 0:
                 self.logger.error(f"Get chat members failed: {result.get('msg')}")
-                return []
-        except Exception as e:
-            self.logger.error(f"Get chat members error: {e}")
-            return []
+                return
+            
+            data = result.get('data', {})
+            for member in data.get('items', []):
+                yield member
+            
+            if not data.get('has_more') or not data.get('page_token'):
+                return
+            params['page_token'] = data['page_token']
     
-    def get_user_info(self, open_id):
+    async def get_user_info(self, open_id):
         """Get detailed user information"""
-        token = self.get_tenant_access_token()
+        token = await self.get_tenant_access_token()
         if not token:
             return None
         
         url = f"{self.base_url}/contact/v3/users/{open_id}"
-        headers = {'Authorization': f'Bearer {token}'}
         params = {'user_id_type': 'open_id'}
         
         try:
-            response = requests.get(url, headers=headers, params=params)
-            result = response.json()
+            result = await self._api_get(url, params)
             
             if result.get('code') == 0:
                 return result.get('data', {}).get('user', {})
@@ -100,13 +99,48 @@ class LarkOpenIDExtractor:
             self.logger.debug(f"Get user info error for {open_id}: {e}")
             return None
     
-    def extract_open_ids_from_chat(self):
+    async def get_users_info_batch(self, open_ids):
+        """Get detailed user information for many Open IDs, keyed by Open ID"""
+        chunks = [open_ids[i:i + USER_BATCH_SIZE] for i in range(0, len(open_ids), USER_BATCH_SIZE)]
+        users = {}
+        for chunk_users in await asyncio.gather(*[self._get_users_chunk(chunk) for chunk in chunks]):
+            users.update(chunk_users)
+        return users
+    
+    async def _get_users_chunk(self, open_ids):
+        """Fetch one batch of users, falling back to single lookups if the batch call fails"""
+        token = await self.get_tenant_access_token()
+        if not token:
+            return {}
+        
+        url = f"{self.base_url}/contact/v3/users/batch"
+        params = [('user_id_type', 'open_id')] + [('user_ids', open_id) for open_id in open_ids]
+        
+        try:
+            result = await self._api_get(url, params)
+            
+            if result.get('code') == 0:
+                items = result.get('data', {}).get('items', [])
+                return {user.get('open_id'): user for user in items}
+            else:
+                self.logger.debug(f"Batch user info failed: {result.get('msg')}")
+        except Exception as e:
+            self.logger.debug(f"Batch user info error: {e}")
+        
+        results = await asyncio.gather(*[self.get_user_info(open_id) for open_id in open_ids], return_exceptions=True)
+        return {
+            open_id: info
+            for open_id, info in zip(open_ids, results)
+            if info and not isinstance(info, BaseException)
+        }
+    
+    async def extract_open_ids_from_chat(self):
         """Extract Open IDs from chat members (most reliable method)"""
         print("👥 Extracting Open IDs from Chat Members...")
         print(f"📋 Chat ID: {self.chat_id}")
         print("=" * 70)
         
-        members = self.get_chat_members()
+        members = [member async for member in self.iter_chat_members()]
         if not members:
             print("❌ No chat members found!")
             return []
@@ -114,33 +148,38 @@ class LarkOpenIDExtractor:
         print(f"👫 Found {len(members)} chat members")
         print("=" * 70)
         
+        # Partition once: only human members need details, bots and apps are just counted
+        users = [m for m in members if m.get('member_type') == 'user']
+        non_users = len(members) - len(users)
+        if non_users:
+            print(f"⏭️ Skipping {non_users} bots/apps")
+            print()
+        
+        member_ids = [m.get('member_id', '') for m in users]
+        valid_open_ids = {member_id for member_id in member_ids if member_id.startswith('ou_')}
+        
+        # Fetch user details in batches of USER_BATCH_SIZE instead of one request per member
+        user_infos = await self.get_users_info_batch(member_ids)
+        
         open_ids = []
         human_users = []
         
-        for i, member in enumerate(members):
-            member_id = member.get('member_id', '')
-            member_type = member.get('member_type', '')
-            
-            print(f"Member {i+1}:")
-            print(f"  ID: {member_id}")
-            print(f"  Type: {member_type}")
-            
-            # Skip bots and apps
-            if member_type != 'user':
-                print(f"  ⏭️ Skipping (not a user)")
-                print()
-                continue
+        # Per-member output is buffered and written once after the loop
+        buf = io.StringIO()
+        for i, member_id in enumerate(member_ids, 1):
+            print(f"Member {i}:", file=buf)
+            print(f"  ID: {member_id}", file=buf)
             
             # Get user details
-            user_info = self.get_user_info(member_id)
+            user_info = user_infos.get(member_id)
             if user_info:
                 name = user_info.get('name', 'Unknown')
                 email = user_info.get('enterprise_email', 'No email')
                 status = user_info.get('status', {}).get('is_activated', False)
                 
-                print(f"  👤 Name: {name}")
-                print(f"  📧 Email: {email}")
-                print(f"  ✅ Active: {status}")
+                print(f"  👤 Name: {name}", file=buf)
+                print(f"  📧 Email: {email}", file=buf)
+                print(f"  ✅ Active: {status}", file=buf)
                 
                 if status:  # Only include active users
                     open_ids.append(member_id)
@@ -150,11 +189,11 @@ class LarkOpenIDExtractor:
                         'email': email
                     })
                 else:
-                    print(f"  ⏭️ Skipping (inactive user)")
+                    print(f"  ⏭️ Skipping (inactive user)", file=buf)
             else:
-                print(f"  ⚠️ Could not get user details")
+                print(f"  ⚠️ Could not get user details", file=buf)
                 # Still include if it looks like a valid Open ID
-                if member_id.startswith('ou_'):
+                if member_id in valid_open_ids:
                     open_ids.append(member_id)
                     human_users.append({
                         'open_id': member_id,
@@ -162,17 +201,20 @@ class LarkOpenIDExtractor:
                         'email': 'Unknown'
                     })
             
-            print()
+            print(file=buf)
+        
+        sys.stdout.write(buf.getvalue())
+        sys.stdout.flush()
         
         return human_users
     
-    def generate_authorization_config(self):
+    async def generate_authorization_config(self):
         """Generate complete authorization configuration"""
         print("🔐 GENERATING OPEN ID AUTHORIZATION CONFIG")
         print("=" * 70)
         
         # Method 1: Get from chat members (most reliable)
-        human_users = self.extract_open_ids_from_chat()
+        human_users = await self.extract_open_ids_from_chat()
         
         if not human_users:
             print("❌ No users found for authorization!")
@@ -237,6 +279,10 @@ class LarkOpenIDExtractor:
         print("   - Run this script again")
         print("   - Their Open ID will appear in the list")
 
+async def run():
+    async with LarkOpenIDExtractor() as extractor:
+        await extractor.generate_authorization_config()
+
 def main():
     """Main function"""
     try:
@@ -248,8 +294,7 @@ def main():
             print("   - LARK_CHAT_ID")
             return
         
-        extractor = LarkOpenIDExtractor()
-        extractor.generate_authorization_config()
+        asyncio.run(run())
         
     except Exception as e:
         print(f"❌ Error: {e}")
@@ -8,12 +8,19 @@ import asyncio
 import json
 import logging
 import time
+from collections import OrderedDict
 from fastapi import FastAPI, Request, Response
 from fastapi.responses import JSONResponse
 import uvicorn
 import sys
 sys.path.append('.')
 
+# orjson is optional: faster webhook body parsing, stdlib json otherwise
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
 from bot.utils.config import Config
 from bot.services.lark_api_client import LarkAPIClient
 from bot.services.message_parser import LarkMessageParser
@@ -26,47 +33,130 @@ from bot.handlers.add_handler import AddHandler
 from bot.handlers.remove_handler import RemoveHandler
 from bot.handlers.check_handler import CheckHandler
 
-# Setup logging
-logging.basicConfig(level=logging.INFO)
+# Setup production-safe logging: rotating files in logs/, console only in development
+# (handlers run on a background thread, off the event loop)
+Config.setup_logging()
 logger = logging.getLogger(__name__)
 
 # Message deduplication cache - FIXED: Only use unique message identifiers
-_PROCESSED_MESSAGES = {}
+# Insertion-ordered by first sighting, so expired entries are always at the front
+_PROCESSED_MESSAGES: "OrderedDict[str, float]" = OrderedDict()
 _MESSAGE_CACHE_TTL = 300  # 5 minutes TTL
-
-def cleanup_message_cache():
-    """Clean old messages from cache"""
-    current_time = time.time()
-    expired_keys = [
-        msg_id for msg_id, timestamp in _PROCESSED_MESSAGES.items()
-        if current_time - timestamp > _MESSAGE_CACHE_TTL
-    ]
-    for key in expired_keys:
-        del _PROCESSED_MESSAGES[key]
+_MESSAGE_CACHE_MAX = 10_000  # Hard cap under retry bursts
 
 def is_duplicate_message(event_id: str, message_id: str) -> bool:
     """
     Check if this message was already processed
     FIXED: Only use unique identifiers (event_id and message_id), NOT content hash
     This allows repeated commands like /check to work properly
+    
+    Must stay free of awaits: the check and the insert then run as one step on
+    the event loop, so concurrent webhook tasks cannot both miss the cache.
     """
-    cleanup_message_cache()  # Clean old entries
+    # A Lark retry repeats both IDs, so one key per message is enough
+    key = message_id or event_id
+    if not key:
+        return False
     
-    # Create unique keys based on message identifiers only
-    event_key = f"event:{event_id}"
-    message_key = f"msg:{message_id}"
+    now = time.monotonic()
+    
+    # Drop expired entries from the front instead of scanning the whole cache
+    while _PROCESSED_MESSAGES:
+        oldest_key, seen_at = next(iter(_PROCESSED_MESSAGES.items()))
+        if now - seen_at <= _MESSAGE_CACHE_TTL:
+            break
+        del _PROCESSED_MESSAGES[oldest_key]
     
     # Check if we've already processed this exact message
-    if event_key in _PROCESSED_MESSAGES or message_key in _PROCESSED_MESSAGES:
+    if key in _PROCESSED_MESSAGES:
         return True
     
     # Mark this message as processed
-    current_time = time.time()
-    _PROCESSED_MESSAGES[event_key] = current_time
-    _PROCESSED_MESSAGES[message_key] = current_time
+    _PROCESSED_MESSAGES[key] = now
+    if len(_PROCESSED_MESSAGES) > _MESSAGE_CACHE_MAX:
+        _PROCESSED_MESSAGES.popitem(last=False)
     
     return False
 
+# Startup announcement card; only the header subtitle (start time) changes per run
+STARTUP_CARD = {
+    "config": {
+        "wide_screen_mode": True,
+        "enable_forward": True
+    },
+    "header": {
+        "template": "green",
+        "title": {
+            "tag": "plain_text",
+            "content": "🎯 Real Webhook Bot Started!"
+        }
+    },
+    "elements": [
+        {
+            "tag": "div",
+            "text": {
+                "tag": "lark_md",
+                "content": "🎉 **I can now hear your actual commands!**"
+            }
+        },
+        {
+            "tag": "hr"
+        },
+        {
+            "tag": "div",
+            "text": {
+                "tag": "lark_md",
+                "content": "💡 **Try typing /help in #commands topic**"
+            }
+        },
+        {
+            "tag": "div",
+            "text": {
+                "tag": "lark_md",
+                "content": "⚡ **Instant responses!**"
+            }
+        },
+        {
+            "tag": "hr"
+        },
+        {
+            "tag": "div",
+            "text": {
+                "tag": "lark_md",
+                "content": "**Available Commands:**"
+            }
+        },
+        {
+            "tag": "div",
+            "text": {
+                "tag": "lark_md",
+                "content": "• **/help** - Show all commands\n• **/check** - Check wallet balances\n• **/list** - List all wallets\n• **/add** - Add new wallet\n• **/remove** - Remove wallet"
+            }
+        },
+        {
+            "tag": "hr"
+        },
+        {
+            "tag": "div",
+            "text": {
+                "tag": "lark_md",
+                "content": "🔗 **Webhook endpoint:** /webhook\n✅ **Ready for real-time interaction!**"
+            }
+        }
+    ]
+}
+
+def build_startup_card() -> dict:
+    """Return STARTUP_CARD with the start time filled into its header."""
+    subtitle = {
+        "tag": "plain_text",
+        "content": f"Started at: {Config.get_current_time()}"
+    }
+    return {**STARTUP_CARD, "header": {**STARTUP_CARD["header"], "subtitle": subtitle}}
+
+# In-flight message tasks, referenced until done so they aren't garbage-collected
+_BG_TASKS = set()
+
 # Global instances
 api_client = None
 topic_manager = None
@@ -85,6 +175,8 @@ async def startup_event():
         Config.validate_config()
         
         api_client = LarkAPIClient(Config.LARK_APP_ID, Config.LARK_APP_SECRET)
+        # One session for the process lifetime; closed in shutdown_event
+        await api_client.start()
         topic_manager = LarkTopicManager(api_client, Config)
         
         # Register handlers
@@ -109,83 +201,20 @@ async def startup_event():
         logger.info("✅ Lark Bot initialized successfully")
         
         # Send startup message as rich card
-        # async with api_client:
-        #     startup_card = {
-        #         "config": {
-        #             "wide_screen_mode": True,
-        #             "enable_forward": True
-        #         },
-        #         "header": {
-        #             "template": "green",
-        #             "title": {
-        #                 "tag": "plain_text",
-        #                 "content": "🎯 Real Webhook Bot Started!"
-        #             },
-        #             "subtitle": {
-        #                 "tag": "plain_text",
-        #                 "content": f"Started at: {Config.get_current_time() if hasattr(Config, 'get_current_time') else 'Now'}"
-        #             }
-        #         },
-        #         "elements": [
-        #             {
-        #                 "tag": "div",
-        #                 "text": {
-        #                     "tag": "lark_md",
-        #                     "content": "🎉 **I can now hear your actual commands!**"
-        #                 }
-        #             },
-        #             {
-        #                 "tag": "hr"
-        #             },
-        #             {
-        #                 "tag": "div",
-        #                 "text": {
-        #                     "tag": "lark_md",
-        #                     "content": "💡 **Try typing /help in #commands topic**"
-        #                 }
-        #             },
-        #             {
-        #                 "tag": "div",
-        #                 "text": {
-        #                     "tag": "lark_md",
-        #                     "content": "⚡ **Instant responses!**"
-        #                 }
-        #             },
-        #             {
-        #                 "tag": "hr"
-        #             },
-        #             {
-        #                 "tag": "div",
-        #                 "text": {
-        #                     "tag": "lark_md",
-        #                     "content": "**Available Commands:**"
-        #                 }
-        #             },
-        #             {
-        #                 "tag": "div",
-        #                 "text": {
-        #                     "tag": "lark_md",
-        #                     "content": "• **/help** - Show all commands\n• **/check** - Check wallet balances\n• **/list** - List all wallets\n• **/add** - Add new wallet\n• **/remove** - Remove wallet"
-        #                 }
-        #             },
-        #             {
-        #                 "tag": "hr"
-        #             },
-        #             {
-        #                 "tag": "div",
-        #                 "text": {
-        #                     "tag": "lark_md",
-        #                     "content": "🔗 **Webhook endpoint:** /webhook\n✅ **Ready for real-time interaction!**"
-        #                 }
-        #             }
-        #         ]
-        #     }
-            
-        #     await topic_manager.send_command_response(startup_card, msg_type="interactive")
+        # await topic_manager.send_command_response(build_startup_card(), msg_type="interactive")
         
     except Exception as e:
         logger.error(f"❌ Startup failed: {e}")
 
+@app.on_event("shutdown")
+async def shutdown_event():
+    """Close the shared Lark API session."""
+    # Let commands already acknowledged to Lark finish before the session goes away
+    if _BG_TASKS:
+        await asyncio.gather(*_BG_TASKS, return_exceptions=True)
+    if api_client:
+        await api_client.close()
+
 @app.get("/")
 async def health_check():
     """Health check endpoint."""
@@ -196,59 +225,31 @@ async def lark_webhook(request: Request):
     try:
         # Get request body
         body = await request.body()
-        raw = body.decode("utf-8")
-        body_json = json.loads(raw)
+        # Both parsers accept the raw bytes directly
+        body_json = orjson.loads(body) if orjson is not None else json.loads(body)
 
         # ENHANCED DEBUG: Show all event types and details
         event_type = body_json.get("header", {}).get("event_type")
-        print("=" * 80)
-        print("🔥🔥🔥 WEBHOOK TRIGGERED!")
-        print(f"🔍 EVENT TYPE: {event_type}")
+        logger.debug("🔥 Webhook triggered: event_type=%s", event_type)
         
-        if event_type == "im.message.receive_v1":
-            print("📨 MESSAGE EVENT RECEIVED!")
+        if event_type == "im.message.receive_v1" and logger.isEnabledFor(logging.DEBUG):
             event_data = body_json.get("event", {})
             message_data = event_data.get("message", {})
-            sender_data = event_data.get("sender", {})
-            
-            # Message details
-            thread_id = message_data.get("thread_id", "")
-            content = message_data.get("content", "")
-            chat_id = message_data.get("chat_id", "")
-            message_id = message_data.get("message_id", "")
-            
-            # Sender details
-            sender_id_obj = sender_data.get("sender_id", {})
-            open_id = sender_id_obj.get("open_id", "")
-            user_id = sender_id_obj.get("user_id", "")
-            union_id = sender_id_obj.get("union_id", "")
+            sender_id_obj = event_data.get("sender", {}).get("sender_id", {})
             
-            print(f"📋 MESSAGE DETAILS:")
-            print(f"   Message ID: {message_id}")
-            print(f"   Chat ID: {chat_id}")
-            print(f"   Thread ID: {thread_id}")
-            print(f"   Content: {content}")
-            print()
-            print(f"👤 SENDER DETAILS:")
-            print(f"   Open ID: {open_id}")
-            print(f"   User ID: {user_id}")
-            print(f"   Union ID: {union_id}")
-            print()
-            print(f"🎯 TOPIC COMPARISON:")
-            print(f"   Expected Commands Thread: omt_1b138b4e444c577b")
-            print(f"   Actual Thread ID: {thread_id}")
-            print(f"   Is Commands Topic: {thread_id == 'omt_1b138b4e444c577b'}")
-            print()
-            print(f"🔐 AUTHORIZATION CHECK:")
-            print(f"   Current Auth User: ou_8306cee2e3b33c84b1799760f98d6e0b")
-            print(f"   Message Open ID: {open_id}")
-            print(f"   Authorization Match: {open_id == 'ou_8306cee2e3b33c84b1799760f98d6e0b'}")
-            print()
-            
-        print("RAW BODY:", raw[:500] + "..." if len(raw) > 500 else raw)
-        print("=" * 80)
+            logger.debug(
+                "📋 Message details: message_id=%s chat_id=%s thread_id=%s content=%s",
+                message_data.get("message_id", ""), message_data.get("chat_id", ""),
+                message_data.get("thread_id", ""), message_data.get("content", "")
+            )
+            logger.debug(
+                "👤 Sender details: open_id=%s user_id=%s union_id=%s",
+                sender_id_obj.get("open_id", ""), sender_id_obj.get("user_id", ""),
+                sender_id_obj.get("union_id", "")
+            )
 
-        logger.info(f"📨 Webhook received: {json.dumps(body_json, indent=2)[:300]}...")
+        # Only the logged prefix is decoded, not the whole body
+        logger.info("📨 Webhook received: %s...", body[:300].decode("utf-8", "replace"))
 
         # Handle URL verification (still schema 1.0 format)
         if body_json.get("type") == "url_verification":
@@ -262,7 +263,10 @@ async def lark_webhook(request: Request):
             # IMPORTANT: Pass the header to the event for deduplication
             event["header"] = body_json.get("header", {})
             
-            await process_message_event(event)
+            # Ack right away so Lark doesn't time out and retry; the command runs in the background
+            task = asyncio.create_task(process_message_event(event))
+            _BG_TASKS.add(task)
+            task.add_done_callback(_BG_TASKS.discard)
             return JSONResponse({"success": True})
 
         logger.info(f"ℹ️ Unknown or unhandled event type: {event_type}")
@@ -300,51 +304,34 @@ async def process_message_event(event):
             logger.warning(f"🚫 DUPLICATE MESSAGE BLOCKED - event_id: {event_id[:8]}..., message_id: {message_id[:10]}...")
             return
         
-        logger.info(f"✅ NEW MESSAGE ACCEPTED - Processing: {json.dumps(message_data, indent=2)[:200]}...")
+        logger.info("✅ NEW MESSAGE ACCEPTED - Processing: %.200s...", message_data)
 
+        # Skip bot messages and other topics straight from the raw event,
+        # before the message content is decoded
+        if event.get("sender", {}).get("sender_type") == "bot":
+            logger.info("🤖 Ignoring bot message")
+            return
+        
+        thread_id = message_data.get("thread_id", "")
+        if not topic_manager.is_topic_message(thread_id, TopicType.COMMANDS):
+            logger.info(f"📍 Message not in commands topic: {thread_id}")
+            return
+        
         # Parse message
         message = message_parser.parse_message(event)
         
-        # ENHANCED DEBUG: Show parsing results
-        print("🔍 PARSING RESULTS:")
-        raw_sender = event.get("sender", {}).get("sender_id", {})
-        print(f"Raw sender_id object: {raw_sender}")
-        print(f"Parsed message.sender_id: {message.sender_id}")
-        print(f"Parsed message.content: {message.content}")
-        print(f"Parsed message.thread_id: {message.thread_id}")
-        print(f"Parsed message.chat_id: {message.chat_id}")
-        print(f"Is from bot: {message.is_from_bot}")
-        print()
-
-        # Skip bot messages
-        if message.is_from_bot:
-            logger.info("🤖 Ignoring bot message")
-            return
+        logger.debug(
+            "🔍 Parsed message: sender_id=%s thread_id=%s chat_id=%s from_bot=%s content=%r",
+            message.sender_id, message.thread_id, message.chat_id, message.is_from_bot, message.content
+        )
 
         # Check if it's a command
         is_command = message_parser.is_command(message)
-        print(f"🎯 COMMAND CHECK:")
-        print(f"   Is command: {is_command}")
-        print(f"   Content: '{message.content}'")
-        print(f"   Starts with '/': {message.content.strip().startswith('/')}")
-        print()
         
         if not is_command:
             logger.info(f"📝 Not a command: {message.content}")
             return
 
-        # Check if it's in commands topic
-        is_commands_topic = topic_manager.is_topic_message(message.thread_id, TopicType.COMMANDS)
-        print(f"📍 TOPIC CHECK:")
-        print(f"   Message thread_id: {message.thread_id}")
-        print(f"   Expected commands topic: {getattr(Config, 'LARK_TOPIC_COMMANDS', 'Not set')}")
-        print(f"   Is commands topic: {is_commands_topic}")
-        print()
-        
-        if not is_commands_topic:
-            logger.info(f"📍 Command not in commands topic: {message.thread_id}")
-            return
-
         # Parse command
         command, args = message_parser.parse_command(message)
 
@@ -364,8 +351,7 @@ async def process_message_event(event):
         )
 
         # Execute command
-        async with api_client:
-            success = await handler_registry.execute_command(context)
+        success = await handler_registry.execute_command(context)
 
         if success:
             logger.info(f"✅ COMMAND EXECUTED: /{command}")
@@ -389,5 +375,8 @@ if __name__ == "__main__":
     print("This bot will ACTUALLY listen to your /help commands")
     print("=" * 50)
     
-    # Run the FastAPI server
-    uvicorn.run(app, host="0.0.0.0", port=8080, log_level="info")
\ No newline at end of file
+    # Run the FastAPI server. loop/http default to "auto", which selects uvloop and
+    # httptools when installed (uvicorn[standard]). A single worker on purpose: the
+    # dedup cache and the Lark API session live in this process. The per-request
+    # access log is off; lark_webhook logs each event itself.
+    uvicorn.run(app, host="0.0.0.0", port=8080, log_level="info", access_log=False)
\ No newline at end of file
@@ -0,0 +1,141 @@
+#!/usr/bin/env python3
+"""
+Shared Lark API client for the ID extractor scripts
+Pooled session, retries, token caching and re-authentication used by find_ids.py and find_user_ids.py
+"""
+
+import asyncio
+import json
+import logging
+import os
+import time
+import aiohttp
+
+# Transient HTTP statuses retried with exponential backoff
+RETRY_STATUSES = frozenset({429, 500, 502, 503, 504})
+RETRY_TOTAL = 3
+RETRY_BACKOFF = 0.3
+
+# Tenant token shared across script runs until shortly before it expires
+TOKEN_CACHE_FILE = os.path.expanduser('~/.lark_token_cache.json')
+# Lark error code for an invalid or expired access token
+TOKEN_INVALID_CODE = 99991663
+
+def _load_cached_token(app_id):
+    """Return (token, expires) from the token cache if it is still valid for app_id"""
+    try:
+        with open(TOKEN_CACHE_FILE) as f:
+            cached = json.load(f)
+    except (OSError, ValueError):
+        return None
+    
+    if not isinstance(cached, dict) or cached.get('app_id') != app_id:
+        return None
+    if time.time() >= cached.get('expires', 0) - 60:
+        return None
+    return cached.get('token'), cached['expires']
+
+def _save_cached_token(app_id, token, expires):
+    """Atomically write the token cache, readable by the owner only"""
+    tmp_path = f"{TOKEN_CACHE_FILE}.tmp"
+    try:
+        fd = os.open(tmp_path, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o600)
+        with os.fdopen(fd, 'w') as f:
+            json.dump({'app_id': app_id, 'token': token, 'expires': expires}, f)
+        os.replace(tmp_path, TOKEN_CACHE_FILE)
+    except OSError as e:
+        logging.getLogger(__name__).debug(f"Token cache write failed: {e}")
+
+def _clear_cached_token():
+    """Remove the token cache after Lark rejects the cached token"""
+    try:
+        os.remove(TOKEN_CACHE_FILE)
+    except FileNotFoundError:
+        pass
+
+class LarkScriptClient:
+    """Base for the extractor scripts: call within `async with` so the session is pooled"""
+    
+    def __init__(self):
+        self.app_id = os.getenv('LARK_APP_ID')
+        self.app_secret = os.getenv('LARK_APP_SECRET')
+        self.chat_id = os.getenv('LARK_CHAT_ID')
+        self.base_url = "https://open.larksuite.com/open-apis"
+        self.tenant_access_token = None
+        self.token_expires = 0
+        
+        # Pooled keep-alive session, opened by `async with`
+        self.session = None
+        self.headers = {}
+        
+        # Setup basic logging
+        logging.basicConfig(level=logging.INFO)
+        self.logger = logging.getLogger(__name__)
+    
+    async def close(self):
+        """Close the pooled HTTP session"""
+        if self.session:
+            await self.session.close()
+            self.session = None
+    
+    async def __aenter__(self):
+        connector = aiohttp.TCPConnector(limit=20, keepalive_timeout=60)
+        self.session = aiohttp.ClientSession(connector=connector)
+        return self
+    
+    async def __aexit__(self, exc_type, exc, tb):
+        await self.close()
+    
+    async def _throttle(self):
+        """Wait before each request attempt; subclasses override to rate limit"""
+    
+    async def _request(self, method, url, **kwargs):
+        """Send a request and decode its JSON body, retrying transient HTTP failures"""
+        for attempt in range(RETRY_TOTAL + 1):
+            await self._throttle()
+            async with self.session.request(method, url, **kwargs) as response:
+                if response.status not in RETRY_STATUSES or attempt == RETRY_TOTAL:
+                    return await response.json(content_type=None)
+            await asyncio.sleep(RETRY_BACKOFF * (2 ** attempt))
+    
+    async def _api_get(self, url, params):
+        """GET an authenticated endpoint, re-authenticating once if the token was rejected"""
+        result = await self._request('GET', url, headers=self.headers, params=params)
+        if result.get('code') == TOKEN_INVALID_CODE:
+            self.logger.info("Access token rejected, re-authenticating")
+            _clear_cached_token()
+            self.tenant_access_token = None
+            if await self.get_tenant_access_token():
+                result = await self._request('GET', url, headers=self.headers, params=params)
+        return result
+    
+    async def get_tenant_access_token(self):
+        """Get access token"""
+        if self.tenant_access_token and time.time() < self.token_expires:
+            return self.tenant_access_token
+        
+        # Reuse a token cached by an earlier run
+        cached = _load_cached_token(self.app_id)
+        if cached:
+            self.tenant_access_token, self.token_expires = cached
+            self.headers = {'Authorization': f'Bearer {self.tenant_access_token}'}
+            return self.tenant_access_token
+        
+        url = f"{self.base_url}/auth/v3/tenant_access_token/internal"
+        data = {"app_id": self.app_id, "app_secret": self.app_secret}
+        
+        try:
+            result = await self._request('POST', url, json=data)
+            
+            if result.get('code') == 0:
+                self.tenant_access_token = result.get('tenant_access_token')
+                self.token_expires = time.time() + 5400
+                self.headers = {'Authorization': f'Bearer {self.tenant_access_token}'}
+                _save_cached_token(self.app_id, self.tenant_access_token, self.token_expires)
+                return self.tenant_access_token
+            else:
+                self.logger.error(f"Token error: {result.get('msg')}")
+                return None
+        except Exception as e:
+            self.logger.error(f"Token exception: {e}")
+            return None
@@ -23,8 +23,9 @@ from bot.services.topic_manager import LarkTopicManager, TopicType
 from bot.services.wallet_service import WalletService
 from bot.services.balance_service import BalanceService
 
-# Setup logging
+# Setup logging (handlers run on a background thread, off the event loop)
 logging.basicConfig(level=logging.INFO)
+Config.queue_root_handlers()
 logger = logging.getLogger(__name__)
 
 class LarkDailyReportScheduler:
@@ -519,10 +520,10 @@ class LarkDailyReportScheduler:
             wallet_data = {}
             for company_name, company_wallets in wallet_list_data['companies'].items():
                 for wallet in company_wallets:
-                    wallet_key = f"{wallet['name']}"
+                    wallet_key = f"{wallet.name}"
                     wallet_data[wallet_key] = {
-                        'name': wallet['name'],
-                        'address': wallet['address'],
+                        'name': wallet.name,
+                        'address': wallet.address,
                         'company': company_name  # Use the actual company name from the data structure
                     }
             
@@ -312,10 +312,10 @@ class LarkDailyReportScheduler:
             wallet_data = {}
             for company_name, company_wallets in wallet_list_data['companies'].items():
                 for wallet in company_wallets:
-                    wallet_key = f"{wallet['name']}"
+                    wallet_key = f"{wallet.name}"
                     wallet_data[wallet_key] = {
-                        'name': wallet['name'],
-                        'address': wallet['address'],
+                        'name': wallet.name,
+                        'address': wallet.address,
                         'company': company_name  # Use the actual company name from the data structure
                     }
             